@@ -1,6 +1,9 @@
-import math
+import collections
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from scipy import stats
+from numpy.lib.stride_tricks import sliding_window_view
 import auxiliaryFunctions as aF
 import thresholdCalculation as tC
 
@@ -14,6 +17,11 @@ Parameters:
         Duration of the EEG examination.
     samplingRate : int
         Sampling rate used in EEG examination.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``, shorter hops make
+        blocks overlap.
 Returns:
     isArtifact : list 
         List of boolean values informing about artifact occurrence in each block.    
@@ -22,67 +30,143 @@ Returns:
 """
 
 
-def detectEEP(channel, examinationTime, samplingRate):
-    # creating empty list for storing tuples containing minimum and maximum channel data values for each time block
-    minMaxList = []
-
-    # channel data is divided into many blocks where each block is 4 s long
-    blockDuration = 4
-
-    # number of blocks (integer, fractional parts are ignored)
-    blockNumber = int(examinationTime / blockDuration)
-
-    # step with which a block of channel data will be extracted
-    step = blockDuration * samplingRate
-
-    # indexes at which a block starts and ends - here the first block; they are incremented in the for loop
-    startPosition = 0
-    endPosition = startPosition + step
-
-    # finding minimum and maximum channel data values in each block and filling minMaxList with them
-    for block in range(blockNumber):
-        xMin = min(channel[startPosition:endPosition])
-        xMax = max(channel[startPosition:endPosition])
-        minMaxList.append((xMin, xMax))
-        startPosition += step
-        endPosition += step
-
-    # getting thresholds values for processed channel from function which calculates them
-    thresholds = tC.calculateThresholdsEEP(minMaxList)
-    minThreshold = thresholds[0]
-    maxThreshold = thresholds[1]
-
-    # creating and filling list with boolean values informing about artifact occurrence in each block
-    isArtifact = []
-    for (xmin, xmax) in minMaxList:
-        xMin = xmin.item()
-        xMax = xmax.item()
-        if xMin != 0 and xMax != 0:
-            if math.log(abs(xMin), 10) > minThreshold or math.log(abs(xMax), 10) > maxThreshold:
-                isArtifact.append(True)
-            else:
-                isArtifact.append(False)
-        elif xMin == 0 or xMax == 0:
-            if xMin > minThreshold or xMax > maxThreshold:
-                isArtifact.append(True)
-            else:
-                isArtifact.append(False)
+def detectEEP(channel, examinationTime, samplingRate, blockDuration=4, hopDuration=None):
+    # number of blocks, number of samples in a block and between starts of consecutive blocks
+    blockNumber, step, hop = getBlockParameters(examinationTime, samplingRate, blockDuration, hopDuration)
+
+    # finding minimum and maximum channel data values in each block
+    minima, maxima = aF.calculateSlidingExtrema(channel, step, hop, blockNumber)
+
+    # finding blocks containing artifacts
+    isArtifact = classifyBlocksEEPArray(minima[np.newaxis], maxima[np.newaxis])[0].tolist()
 
     # returning list informing about artifact occurrences and integer value informing about number of blocks
     return isArtifact, blockNumber
 
 
 """
-Performs detection function ``detectEEP`` on whole EEG examination data given by ``inputData``.
+Finds blocks containing External Electrostatic Potentials (EEP) in all channels at once, given minimum and maximum
+channel data values in each block by ``minima`` and ``maxima`` (see ``compareThresholdsEEP``).
+Parameters:
+    minima : ndarray
+        Minimum signal values of each time block, one row per channel.
+    maxima : ndarray
+        Maximum signal values of each time block, one row per channel.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
+
+
+def classifyBlocksEEPArray(minima, maxima):
+    minima = np.asarray(minima, dtype=np.float64)
+    maxima = np.asarray(maxima, dtype=np.float64)
+
+    # getting thresholds values for every channel from function which calculates them
+    minThresholds, maxThresholds = tC.calculateThresholdsEEPArray(minima, maxima)
+
+    # returning boolean matrix informing about artifact occurrences
+    return compareThresholdsEEP(minima, maxima, minThresholds, maxThresholds)
+
+
+"""
+Compares minimum and maximum channel data values in each block, given by ``minima`` and ``maxima``, with thresholds of
+External Electrostatic Potentials (EEP) detection function. Logarithms of values of blocks in which both of them are
+non-zero are compared with thresholds; otherwise values themselves are compared.
+Parameters:
+    minima : ndarray
+        Minimum signal values of each time block, one row per channel.
+    maxima : ndarray
+        Maximum signal values of each time block, one row per channel.
+    minThresholds : ndarray
+        Minimum threshold value of every channel.
+    maxThresholds : ndarray
+        Maximum threshold value of every channel.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
+
+
+def compareThresholdsEEP(minima, maxima, minThresholds, maxThresholds):
+    minima = np.asarray(minima, dtype=np.float64)
+    maxima = np.asarray(maxima, dtype=np.float64)
+    minThresholds = np.asarray(minThresholds)[:, np.newaxis]
+    maxThresholds = np.asarray(maxThresholds)[:, np.newaxis]
+
+    # comparing normalised values, or values themselves in blocks with a zero minimum or maximum
+    isLogArtifact = (aF.calculateLogModulus(minima) > minThresholds) | (aF.calculateLogModulus(maxima) > maxThresholds)
+    isValueArtifact = (minima > minThresholds) | (maxima > maxThresholds)
+    isArtifactMatrix = np.where((minima != 0) & (maxima != 0), isLogArtifact, isValueArtifact)
+
+    # returning boolean matrix informing about artifact occurrences
+    return isArtifactMatrix
+
+
+"""
+Detects External Electrostatic Potentials (EEP) in all EEG channels of EEG examination data given by ``inputData``.
+Minimum and maximum values of all blocks are found at once, in segments of whole data or of a stream of blocks (see
+``performDetections``).
 Parameters:
     inputData : ndarray
-        Whole EEG examination data.
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
     eegChannelNumber : int
         Number of EEG channels in EEG examination data.
     examinationTime : int
         Duration of the EEG examination.
     samplingRate : int
         Sampling rate used in EEG examination.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+    thresholdModel : dict
+        Thresholds fitted over a cohort of examinations (see ``thresholdCalculation/fitThresholdModel``); None uses
+        thresholds of this examination.
+    workers : int
+        Number of threads measuring blocks of data at once (see ``performDetections``).
+    scale : ndarray
+        Value of one unit of integer EEG examination data in each channel (see ``dataExtraction/quantizeData``); EEP
+        values are multiplied by it, so that they are in the units of thresholds fitted over a cohort. None for
+        floating point data.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
+
+
+def detectEEPMatrix(inputData, eegChannelNumber, examinationTime, samplingRate, blockDuration=4, hopDuration=None, thresholdModel=None, workers=1, scale=None):
+    results = performDetections(inputData, eegChannelNumber, examinationTime, samplingRate, ("EEP",),
+                                blockDuration=blockDuration, hopDuration=hopDuration, thresholdModel=thresholdModel,
+                                workers=workers, scale=scale)[0]
+    return results["EEP"]
+
+
+"""
+Performs EEP detection on whole EEG examination data given by ``inputData``; a block contains an artifact when it
+contains one in any of EEG channels.
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+    thresholdModel : dict
+        Thresholds fitted over a cohort of examinations (see ``thresholdCalculation/fitThresholdModel``); None uses
+        thresholds of this examination.
+    workers : int
+        Number of threads measuring blocks of data at once (see ``performDetections``).
+    scale : ndarray
+        Value of one unit of integer EEG examination data in each channel (see ``dataExtraction/quantizeData``); EEP
+        values are multiplied by it, so that they are in the units of thresholds fitted over a cohort. None for
+        floating point data.
 Returns:
     isArtifactOutput : list 
         List of boolean values informing about artifact occurrence in each block of EEG examination data.   
@@ -91,42 +175,90 @@ Returns:
 """
 
 
-def performEEPDetection(inputData, eegChannelNumber, examinationTime, samplingRate):
+def performEEPDetection(inputData, eegChannelNumber, examinationTime, samplingRate, blockDuration=4, hopDuration=None, thresholdModel=None, workers=1, scale=None):
     # creating short information about type of the artifact and it's occurrence in a block
     message = "An artifact reflected by the external electrostatic potential occurrence has been detected in this " \
               "block"
 
-    # creating empty list for storing information about artifact occurrence in each block of EEG data
-    isArtifactOutput = []
-
-    # performing EEP detection function in every channel and changing isArtifactOutput content respectively
-    for channelNumber in range(eegChannelNumber):
-        if eegChannelNumber == 19:
-            channel = np.array(inputData[:, channelNumber + 1])
-        elif eegChannelNumber == 20:
-            channel = np.array(inputData[:, channelNumber])
-        isArtifact = detectEEP(channel, examinationTime, samplingRate)[0]
-        blockNumber = detectEEP(channel, examinationTime, samplingRate)[1]
-
-        # filling isArtifactOutput with isArtifact content when iterating outer for loop for the first time
-        if channelNumber == 0:
-            isArtifactOutput = isArtifact
-
-        # respectively changing or leaving as is the isArtifactOutput content when iterating outer for loop for second
-        # and more times
-        if channelNumber != 0:
-            for block in range(blockNumber):
-                if isArtifact[block]:
-                    if isArtifactOutput[block] != isArtifact[block]:
-                        isArtifactOutput[block] = isArtifact[block]
+    # performing EEP detection in all channels at once
+    isArtifactMatrix = detectEEPMatrix(inputData, eegChannelNumber, examinationTime, samplingRate, blockDuration, hopDuration, thresholdModel, workers, scale)
+
+    # merging results of every channel
+    isArtifactOutput = isArtifactMatrix.any(axis=0).tolist()
 
     # returning list informing about artifact occurrence in each block and message
     return isArtifactOutput, message
 
 
+"""
+Checks if EEG examination data given by ``inputData`` are a stream of blocks, like the one yielded by 
+``dataExtraction/iterateBlocks``, rather than whole data which can be indexed.
+Parameters:
+    inputData : ndarray or iterable
+        Whole EEG examination data or blocks of it.
+Returns:
+    isStream : bool
+        Boolean value informing if ``inputData`` is a stream of blocks.
+"""
+
+
+def isBlockStream(inputData):
+    return not hasattr(inputData, "__getitem__")
+
+
+"""
+Calculates number of blocks of EEG examination data and their length. Blocks are ``blockDuration`` long and start every
+``hopDuration``; only whole blocks are used, fractional parts are ignored.
+Parameters:
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+Returns:
+    blockNumber : int
+        Number of blocks.
+    step : int
+        Number of samples in a block.
+    hop : int
+        Number of samples between starts of consecutive blocks.
+"""
+
+
+def getBlockParameters(examinationTime, samplingRate, blockDuration=4, hopDuration=None):
+    if hopDuration is None:
+        hopDuration = blockDuration
+    step = int(round(blockDuration * samplingRate))
+    hop = int(round(hopDuration * samplingRate))
+    if hop <= 0 or step <= 0:
+        raise ValueError("Block and hop durations have to be longer than a sample")
+    sampleNumber = int(examinationTime * samplingRate)
+    blockNumber = (sampleNumber - step) // hop + 1 if sampleNumber >= step else 0
+    return blockNumber, step, hop
+
+
 # **********************************************************************************************************************
 
 
+"""
+Checks if EEG examination data with ``eegChannelNumber`` EEG channels contain ECG channel, stored before EEG channels.
+ASC files with 19 EEG channels contain it; TXT files contain 20 EEG channels and no ECG channel.
+Parameters:
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+Returns:
+    hasChannel : bool
+        Boolean value informing if EEG examination data contain ECG channel.
+"""
+
+
+def hasECGChannel(eegChannelNumber):
+    return eegChannelNumber == 19
+
+
 """
 Detects potentials derived from ECG in data block given by ``dataBlock``.
 Parameters:
@@ -141,40 +273,68 @@ Returns:
 
 
 def detectECG(dataBlock, eegChannelNumber):
-    # creating empty list fot storing correlation coefficient values for a block time and all channels
-    coefficients = []
-
-    # ndarray containing ECG signal values
-    channelECG = np.array(dataBlock[:, 0])
-
-    # calculating value of correlation coefficient of the signal in channel with ECG signal for all channels
-    for channelNumber in range(eegChannelNumber):
-        channel = np.array(dataBlock[:, channelNumber + 1])
-        coefficient = stats.pearsonr(channelECG, channel)
-        if coefficient[0] is not np.NaN:
-            coefficients.append(coefficient[0])
-
-    # finding maximum value in list of correlation coefficients in a time block
-    if len(coefficients) > 0:
-        maxCoefficient = max(coefficients)
-    else:
-        maxCoefficient = 0
+    # calculating maximum correlation coefficient in a block the same way as for many blocks at once
+    maxCoefficient = float(calculateMaxCoefficients(np.asarray(dataBlock)[np.newaxis], eegChannelNumber)[0])
 
     # returning maximum correlation coefficient
     return maxCoefficient
 
 
 """
-Performs detection function ``detectECG`` on whole EEG examination data given by ``inputData``.
+Calculates maximum correlation coefficients of EEG channels with ECG channel in many blocks of data given by
+``dataBlocks`` at once. Coefficients of constant channels are skipped; when there are no other coefficients in a block
+it's maximum coefficient is 0. Raises ValueError when EEG examination data have no ECG channel (see ``hasECGChannel``).
+Parameters:
+    dataBlocks : ndarray
+        Parts of EEG examination data of shape (blocks, samples in a block, channels), containing all examination data
+        channels - both EEG and ECG.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+Returns:
+    maxCoefficients : ndarray
+        Maximum correlation coefficient of each block.
+"""
+
+
+def calculateMaxCoefficients(dataBlocks, eegChannelNumber):
+    # without ECG channel the first EEG channel would be correlated with the others
+    if not hasECGChannel(eegChannelNumber):
+        raise ValueError("ECG detection needs ECG channel, EEG examination data with %d EEG channels have none"
+                         % eegChannelNumber)
+
+    # calculating correlation coefficients of the signal in every channel with ECG signal, stored first
+    coefficients = aF.calculateCorrelationArray(dataBlocks[:, :, 1:eegChannelNumber + 1].transpose(0, 2, 1),
+                                                dataBlocks[:, :, 0])
+
+    # finding maximum value of correlation coefficients in each time block, skipping not defined ones
+    isDefined = ~np.isnan(coefficients)
+    maxCoefficients = np.max(np.where(isDefined, coefficients, -np.inf), axis=1, initial=-np.inf)
+    maxCoefficients[~isDefined.any(axis=1)] = 0
+
+    # returning maximum correlation coefficients
+    return maxCoefficients
+
+
+"""
+Performs ECG detection on whole EEG examination data given by ``inputData``. Blocks are processed ``chunkBlocks`` at a
+time. EEG examination data without ECG channel (see ``hasECGChannel``) are not checked, none of their blocks is marked.
 Parameters:
     inputData : ndarray
-        Whole EEG examination data.
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
     eegChannelNumber : int
         Number of EEG channels in EEG examination data.
     examinationTime : int
         Duration of the EEG examination.
     samplingRate : int
         Sampling rate used in EEG examination.
+    chunkBlocks : int
+        Number of blocks processed at once.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+    workers : int
+        Number of threads measuring blocks of data at once (see ``performDetections``).
 Returns:
     isArtifactOutput : list 
         List of boolean values informing about artifact occurrence in each block of EEG examination data.
@@ -183,40 +343,16 @@ Returns:
 """
 
 
-def performECGDetection(inputData, eegChannelNumber, examinationTime, samplingRate):
+def performECGDetection(inputData, eegChannelNumber, examinationTime, samplingRate, chunkBlocks=64, blockDuration=4, hopDuration=None, workers=1):
     # creating short information about type of the artifact and it's occurrence in a block
     message = "An artifact derived from ECG has been detected in this block"
 
-    # creating empty list for storing information about artifact occurrence in each block of EEG data
-    isArtifactOutput = []
-
-    # input data is divided into many blocks where each block is 4s long
-    blockDuration = 4
-
-    # number of blocks (integer, fractional parts are ignored)
-    blockNumber = int(examinationTime / blockDuration)
-
-    # step with which a block of input data will be extracted
-    step = blockDuration * samplingRate
-
-    # indexes at which a block starts and ends - here the first block; they are incremented in the for loop
-    startPosition = 0
-    endPosition = startPosition + step
-
-    # getting threshold value from function which calculates it
-    threshold = tC.calculateThresholdECG()
-
     # finding correlation coefficient maximum value in each block and all channels
     # and checking if an artifact occurs in a block
-    for block in range(blockNumber):
-        dataBlock = np.array(inputData[startPosition:endPosition, :])
-        maxCoefficient = detectECG(dataBlock, eegChannelNumber)
-        if maxCoefficient > threshold:
-            isArtifactOutput.append(True)
-        else:
-            isArtifactOutput.append(False)
-        startPosition += step
-        endPosition += step
+    results = performDetections(inputData, eegChannelNumber, examinationTime, samplingRate, ("ECG",),
+                                chunkBlocks=chunkBlocks, blockDuration=blockDuration, hopDuration=hopDuration,
+                                workers=workers)[0]
+    isArtifactOutput = results["ECG"].any(axis=0).tolist()
 
     # returning list informing about artifact occurrence in each block and message
     return isArtifactOutput, message
@@ -240,6 +376,10 @@ Parameters:
         Nyquist frequency value equal to half of sampling rate. 
     electricFrequency : int
         Electric network frequency determined in EEGData class definition.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
 Returns:
     isArtifact : list 
         List of boolean values informing about artifact occurrence in each block.    
@@ -248,50 +388,121 @@ Returns:
 """
 
 
-def detectLFP(channel, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency):
-    # creating empty list for storing Fourier based function values for each time block
-    fourierList = []
+def detectLFP(channel, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency, blockDuration=4, hopDuration=None):
+    # number of blocks, number of samples in a block and between starts of consecutive blocks
+    blockNumber, step, hop = getBlockParameters(examinationTime, samplingRate, blockDuration, hopDuration)
 
-    # channel data is divided into many blocks where each block is 4 s long
-    blockDuration = 4
+    # viewing channel data as one row of blocks
+    channel = np.asarray(channel[:max(blockNumber - 1, 0) * hop + step])
+    blocks = sliding_window_view(channel, step)[::hop][:blockNumber][np.newaxis]
 
-    # number of blocks (integer, fractional parts are ignored)
-    blockNumber = int(examinationTime / blockDuration)
+    # finding Fourier-based function values in each block
+    fourierMatrix = calculateFourierMatrix(blocks, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency)
 
-    # step with which a block of channel data will be extracted
-    step = blockDuration * samplingRate
+    # finding blocks containing artifacts
+    isArtifact = classifyBlocksLFPArray(fourierMatrix)[0].tolist()
 
-    # indexes at which a block starts and ends - here the first block; they are incremented in the for loop
-    startPosition = 0
-    endPosition = startPosition + step
+    # returning list informing about artifact occurrences and integer value informing about number of blocks
+    return isArtifact, blockNumber
 
-    # finding Fourier-based function values in each block and filling fourierList with them
-    for block in range(blockNumber):
-        fourierValue = aF.calculateFourierFunction(channel[startPosition:endPosition], samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency)
-        fourierList.append(fourierValue)
-        startPosition += step
-        endPosition += step
 
-    # getting threshold value from function which calculates it
-    threshold = tC.calculateThresholdLFP(fourierList)
+"""
+Finds blocks containing low-frequency potentials (LFP) in all channels at once, given Fourier-based function values in
+each block by ``fourierMatrix``.
+Parameters:
+    fourierMatrix : ndarray
+        Fourier-based function values of each time block, one row per channel.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
 
-    # creating and filling list with boolean values informing about artifact occurrence in each block
-    isArtifact = []
-    for fourierValue in fourierList:
-        if fourierValue > threshold:
-            isArtifact.append(True)
-        else:
-            isArtifact.append(False)
 
-    # returning list informing about artifact occurrences and integer value informing about number of blocks
-    return isArtifact, blockNumber
+def classifyBlocksLFPArray(fourierMatrix):
+    # getting threshold value of every channel from function which calculates them
+    thresholds = tC.calculateThresholdLFPArray(fourierMatrix)
+
+    # returning boolean matrix informing about artifact occurrences
+    return fourierMatrix > thresholds[:, np.newaxis]
+
+
+"""
+Calculates Fourier-based function values of blocks of EEG channels given by ``blocks``, e.g. the ``blocks`` of a
+segment yielded by ``iterateSegments`` (see ``createSegment``). Blocks are transformed ``chunkBlocks`` at a time, so
+memory used by spectra stays bounded for long examinations.
+Parameters:
+    blocks : ndarray
+        EEG channels of shape (channels, blocks, samples in a block).
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    lambdaFrequency : float
+        Lambda frequency value determined in EEGData class definition.
+    nyquistFrequency : int
+        Nyquist frequency value equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency determined in EEGData class definition.
+    chunkBlocks : int
+        Number of blocks transformed at once.
+Returns:
+    fourierMatrix : ndarray
+        Fourier-based function values of each time block, one row per channel.
+"""
+
+
+def calculateFourierMatrix(blocks, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency, chunkBlocks=64):
+    fourierMatrix = np.zeros(blocks.shape[:2])
+    for start in range(0, blocks.shape[1], chunkBlocks):
+        fourierMatrix[:, start:start + chunkBlocks] = aF.calculateFourierFunctionArray(blocks[:, start:start + chunkBlocks], samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency)
+    return fourierMatrix
+
+
+"""
+Detects low-frequency potentials (LFP) in all EEG channels of EEG examination data given by ``inputData``. Fourier-based
+function values of all blocks are calculated in segments of whole data or of a stream of blocks (see
+``performDetections``).
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    lambdaFrequency : float
+        Lambda frequency value determined in EEGData class definition.
+    nyquistFrequency : int
+        Nyquist frequency value equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency determined in EEGData class definition.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+    thresholdModel : dict
+        Thresholds fitted over a cohort of examinations (see ``thresholdCalculation/fitThresholdModel``); None uses
+        thresholds of this examination.
+    workers : int
+        Number of threads measuring blocks of data at once (see ``performDetections``).
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
+
+
+def detectLFPMatrix(inputData, eegChannelNumber, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency, blockDuration=4, hopDuration=None, thresholdModel=None, workers=1):
+    results = performDetections(inputData, eegChannelNumber, examinationTime, samplingRate, ("LFP",), lambdaFrequency,
+                                nyquistFrequency, electricFrequency, blockDuration=blockDuration, hopDuration=hopDuration,
+                                thresholdModel=thresholdModel, workers=workers)[0]
+    return results["LFP"]
 
 
 """
-Performs detection function ``detectLFP`` on whole EEG examination data given by ``inputData``.
+Performs LFP detection on whole EEG examination data given by ``inputData``; a block contains an artifact when it
+contains one in any of EEG channels.
 Parameters:
     inputData : ndarray
-        Whole EEG examination data.
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
     eegChannelNumber : int
         Number of EEG channels in EEG examination data.
     examinationTime : int
@@ -304,6 +515,15 @@ Parameters:
         Nyquist frequency value equal to half of sampling rate. 
     electricFrequency : int
         Electric network frequency determined in EEGData class definition.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+    thresholdModel : dict
+        Thresholds fitted over a cohort of examinations (see ``thresholdCalculation/fitThresholdModel``); None uses
+        thresholds of this examination.
+    workers : int
+        Number of threads measuring blocks of data at once (see ``performDetections``).
 Returns:
     isArtifactOutput : list 
         List of boolean values informing about artifact occurrence in each block of EEG examination data.
@@ -312,33 +532,716 @@ Returns:
 """
 
 
-def performLFPDetection(inputData, eegChannelNumber, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency):
+def performLFPDetection(inputData, eegChannelNumber, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency, blockDuration=4, hopDuration=None, thresholdModel=None, workers=1):
     # creating short information about type of the artifact and it's occurrence in a block
     message = "An artifact reflected by the low-frequency potential occurrence has been detected in this block"
 
-    # creating empty list for storing information about artifact occurrence in each block of EEG data
-    isArtifactOutput = []
-
-    # performing EEP detection function in every channel and changing isArtifactOutput content respectively
-    for channelNumber in range(eegChannelNumber):
-        if eegChannelNumber == 19:
-            channel = np.array(inputData[:, channelNumber + 1])
-        elif eegChannelNumber == 20:
-            channel = np.array(inputData[:, channelNumber])
-        isArtifact = detectLFP(channel, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency)[0]
-        blockNumber = detectLFP(channel, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency)[1]
-
-        # filling isArtifactOutput with isArtifact content when iterating outer for loop for the first time
-        if channelNumber == 0:
-            isArtifactOutput = isArtifact
-
-        # respectively changing or leaving as is the isArtifactOutput content when iterating outer for loop for second
-        # and more times
-        if channelNumber != 0:
-            for block in range(blockNumber):
-                if isArtifact[block]:
-                    if isArtifactOutput[block] != isArtifact[block]:
-                        isArtifactOutput[block] = isArtifact[block]
+    # performing LFP detection in all channels at once
+    isArtifactMatrix = detectLFPMatrix(inputData, eegChannelNumber, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency, blockDuration, hopDuration, thresholdModel, workers)
+
+    # merging results of every channel
+    isArtifactOutput = isArtifactMatrix.any(axis=0).tolist()
 
     # returning list informing about artifact occurrence in each block
     return isArtifactOutput, message
+
+
+# *********************************************************************************************************************
+
+
+"""
+Returns power spectra of EEG channels in a segment of blocks given by ``segment`` (see ``iterateSegments``). Spectra are
+calculated once, when the first detector needs them, and shared by all detectors processing the segment.
+Parameters:
+    segment : dict
+        Views of blocks of EEG examination data and values calculated on them.
+Returns:
+    powerSpectrum : ndarray
+        Power spectra of EEG channels of shape (channels, blocks, frequencies).
+"""
+
+
+def getSegmentSpectrum(segment):
+    if "powerSpectrum" not in segment:
+        segment["powerSpectrum"] = aF.calculatePowerSpectrumArray(segment["blocks"])
+    return segment["powerSpectrum"]
+
+
+"""
+Calculates minimum and maximum values of EEG channels in each block of a segment given by ``segment``. Overlapping
+blocks are reduced from the samples of the segment (see ``auxiliaryFunctions/calculateSlidingExtrema``), so every sample
+is read once. Values of integer data are multiplied by their scale, when it is given in ``parameters``.
+Parameters:
+    segment : dict
+        Views of blocks of EEG examination data and values calculated on them.
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    features : ndarray
+        Minimum and maximum values of shape (2, channels, blocks).
+"""
+
+
+def measureEEP(segment, parameters):
+    minima, maxima = aF.calculateSlidingExtrema(segment["samples"], parameters["blockLength"], parameters["hopLength"],
+                                                segment["blocks"].shape[1])
+    features = np.stack((minima.T, maxima.T))
+    if parameters["scale"] is not None:
+        features = features * parameters["scale"][:, np.newaxis]
+    return features
+
+
+"""
+Finds blocks containing External Electrostatic Potentials (EEP), given values calculated by ``measureEEP`` on all blocks
+by ``features``.
+Parameters:
+    features : ndarray
+        Minimum and maximum values of shape (2, channels, blocks).
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
+
+
+def classifyEEP(features, parameters):
+    if parameters["thresholdModel"] is not None:
+        # values of integer data without their scale are not in the units of thresholds
+        if np.issubdtype(features.dtype, np.integer):
+            raise ValueError("Threshold model can not be used on integer data without their scale")
+        thresholds = tC.getModelThresholds(parameters["thresholdModel"], "EEP", parameters)
+        return compareThresholdsEEP(features[0], features[1], thresholds["minThresholds"], thresholds["maxThresholds"])
+    return classifyBlocksEEPArray(features[0], features[1])
+
+
+"""
+Calculates Fourier-based function values of EEG channels in each block of a segment given by ``segment``.
+Parameters:
+    segment : dict
+        Views of blocks of EEG examination data and values calculated on them.
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    features : ndarray
+        Fourier-based function values of shape (channels, blocks).
+"""
+
+
+def measureLFP(segment, parameters):
+    return aF.calculateFourierFunctionSpectrum(getSegmentSpectrum(segment), segment["blocks"].shape[2], parameters["samplingRate"], parameters["lambdaFrequency"], parameters["nyquistFrequency"], parameters["electricFrequency"])
+
+
+"""
+Finds blocks containing low-frequency potentials (LFP), given values calculated by ``measureLFP`` on all blocks by
+``features``.
+Parameters:
+    features : ndarray
+        Fourier-based function values of shape (channels, blocks).
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
+
+
+def classifyLFP(features, parameters):
+    if parameters["thresholdModel"] is not None:
+        thresholds = tC.getModelThresholds(parameters["thresholdModel"], "LFP", parameters)
+        return features > np.asarray(thresholds["thresholds"])[:, np.newaxis]
+    return classifyBlocksLFPArray(features)
+
+
+"""
+Calculates maximum correlation coefficients of EEG channels with ECG channel in each block of a segment given by
+``segment``. EEG examination data without ECG channel have no values, so none of their blocks is classified as an
+artifact.
+Parameters:
+    segment : dict
+        Views of blocks of EEG examination data and values calculated on them.
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    features : ndarray
+        Maximum correlation coefficients of shape (1, blocks), or (0, blocks) without ECG channel.
+"""
+
+
+def measureECG(segment, parameters):
+    if not hasECGChannel(parameters["eegChannelNumber"]):
+        return np.zeros((0, segment["dataBlocks"].shape[0]))
+    return calculateMaxCoefficients(segment["dataBlocks"], parameters["eegChannelNumber"])[np.newaxis]
+
+
+"""
+Finds blocks containing potentials derived from ECG, given values calculated by ``measureECG`` on all blocks by
+``features``.
+Parameters:
+    features : ndarray
+        Maximum correlation coefficients of shape (1, blocks), or (0, blocks) without ECG channel.
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, in one row.
+"""
+
+
+def classifyECG(features, parameters):
+    return features > tC.calculateThresholdECG()
+
+
+"""
+Updates running statistics of EEP detection function, given by ``state``, with values calculated by ``measureEEP`` on
+one block by ``features``. Statistics are created with the first block.
+Parameters:
+    features : ndarray
+        Minimum and maximum values of shape (2, channels, 1).
+    state : dict
+        Running statistics of normalised minimum and maximum values (see ``thresholdCalculation/RunningStatistics``).
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    None
+"""
+
+
+def updateEEP(features, state, parameters):
+    if not state:
+        state["minStatistics"] = tC.RunningStatistics(features.shape[1])
+        state["maxStatistics"] = tC.RunningStatistics(features.shape[1])
+    state["minStatistics"].update(aF.calculateLogModulus(features[0, :, 0]))
+    state["maxStatistics"].update(aF.calculateLogModulus(features[1, :, 0]))
+
+
+"""
+Finds blocks containing External Electrostatic Potentials (EEP), given values calculated by ``measureEEP`` by
+``features``, using thresholds of running statistics given by ``state``.
+Parameters:
+    features : ndarray
+        Minimum and maximum values of shape (2, channels, blocks).
+    state : dict
+        Running statistics updated by ``updateEEP``.
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
+
+
+def flagEEP(features, state, parameters):
+    minThresholds, maxThresholds = tC.calculateThresholdsEEPOnline(state["minStatistics"], state["maxStatistics"])
+    return compareThresholdsEEP(features[0], features[1], minThresholds, maxThresholds)
+
+
+"""
+Updates running statistics of LFP detection function, given by ``state``, with values calculated by ``measureLFP`` on
+one block by ``features``. Statistics are created with the first block.
+Parameters:
+    features : ndarray
+        Fourier-based function values of shape (channels, 1).
+    state : dict
+        Running statistics of Fourier-based function values (see ``thresholdCalculation/RunningStatistics``).
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    None
+"""
+
+
+def updateLFP(features, state, parameters):
+    if not state:
+        state["statistics"] = tC.RunningStatistics(features.shape[0])
+    state["statistics"].update(features[:, 0])
+
+
+"""
+Finds blocks containing low-frequency potentials (LFP), given values calculated by ``measureLFP`` by ``features``, using
+thresholds of running statistics given by ``state``.
+Parameters:
+    features : ndarray
+        Fourier-based function values of shape (channels, blocks).
+    state : dict
+        Running statistics updated by ``updateLFP``.
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Returns:
+    isArtifactMatrix : ndarray
+        Boolean values informing about artifact occurrence in each block, one row per channel.
+"""
+
+
+def flagLFP(features, state, parameters):
+    return features > tC.calculateThresholdLFPOnline(state["statistics"])[:, np.newaxis]
+
+
+"""
+ECG detection function uses a constant threshold, so it keeps no running statistics.
+"""
+
+
+def updateECG(features, state, parameters):
+    pass
+
+
+def flagECG(features, state, parameters):
+    return classifyECG(features, parameters)
+
+
+# detection functions run by ``performDetections`` and ``performOnlineDetections``, by name of the artifact; a detector
+# calculates values of every segment of blocks ("measure") and then classifies all blocks given values of all segments,
+# concatenated along the last axis ("classify"); online, it's running statistics are updated with every block ("update")
+# and blocks are classified with thresholds known so far ("flag")
+detectorRegistry = {
+    "EEP": {"measure": measureEEP, "classify": classifyEEP, "update": updateEEP, "flag": flagEEP},
+    "LFP": {"measure": measureLFP, "classify": classifyLFP, "update": updateLFP, "flag": flagLFP},
+    "ECG": {"measure": measureECG, "classify": classifyECG, "update": updateECG, "flag": flagECG}
+}
+
+
+"""
+Divides EEG examination data given by ``inputData`` into segments of ``chunkBlocks`` blocks, without copying them. Blocks
+yielded by ``dataExtraction/iterateBlocks`` are gathered until samples of a segment arrive, whatever their length, so
+only samples of one segment are kept at a time.
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    chunkBlocks : int
+        Number of blocks in a segment.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+Yields:
+    segment : dict
+        Samples of EEG channels covering blocks of the segment, one row per sample, and views of blocks of all channels,
+        of shape (blocks, samples in a block, channels), and of EEG channels, of shape (channels, blocks, samples in a
+        block).
+"""
+
+
+def iterateSegments(inputData, eegChannelNumber, examinationTime, samplingRate, chunkBlocks=64, blockDuration=4, hopDuration=None):
+    blockNumber, step, hop = getBlockParameters(examinationTime, samplingRate, blockDuration, hopDuration)
+
+    # ECG channel, stored first, is skipped
+    firstChannel = 1 if hasECGChannel(eegChannelNumber) else 0
+
+    if isBlockStream(inputData):
+        # samples which arrived and are not used by blocks of yielded segments, as pieces in order of arrival, their
+        # number and the number of the first of them; pieces are joined once per segment, not with every block
+        pieces = []
+        bufferLength = 0
+        bufferStart = 0
+        firstBlock = 0
+        # the stream is followed by an empty block, so that blocks of an incomplete last segment are yielded too
+        for blockIndex, samples in itertools.chain(inputData, [(None, None)]):
+            isEnd = samples is None
+            if not isEnd:
+                pieces.append(samples.T)
+                bufferLength += samples.shape[1]
+            if not pieces:
+                break
+
+            # yielding segments whose samples arrived
+            while firstBlock < blockNumber:
+                readyBlocks = min((bufferStart + bufferLength - step) // hop + 1, blockNumber) - firstBlock
+                if readyBlocks <= 0 or (readyBlocks < min(chunkBlocks, blockNumber - firstBlock) and not isEnd):
+                    break
+                readyBlocks = min(readyBlocks, chunkBlocks)
+                buffer = np.concatenate(pieces) if len(pieces) > 1 else pieces[0]
+                start = firstBlock * hop - bufferStart
+                yield createSegment(buffer[start:start + (readyBlocks - 1) * hop + step], step, hop, readyBlocks,
+                                    firstChannel, eegChannelNumber)
+                firstBlock += readyBlocks
+
+                # dropping samples which are not used by following blocks
+                buffer = buffer[firstBlock * hop - bufferStart:]
+                pieces = [buffer]
+                bufferLength = len(buffer)
+                bufferStart = firstBlock * hop
+            if firstBlock >= blockNumber:
+                break
+    else:
+        for firstBlock in range(0, blockNumber, chunkBlocks):
+            segmentBlocks = min(chunkBlocks, blockNumber - firstBlock)
+            samples = np.asarray(inputData[firstBlock * hop:(firstBlock + segmentBlocks - 1) * hop + step])
+            yield createSegment(samples, step, hop, segmentBlocks, firstChannel, eegChannelNumber)
+
+
+"""
+Creates segment of blocks of samples given by ``samples``, called inside the ``iterateSegments`` function.
+Parameters:
+    samples : ndarray
+        Samples of all channels covering blocks of the segment, one row per sample.
+    step : int
+        Number of samples in a block.
+    hop : int
+        Number of samples between starts of consecutive blocks.
+    blockNumber : int
+        Number of blocks in the segment.
+    firstChannel : int
+        Number of the first EEG channel.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+Returns:
+    segment : dict
+        Samples of EEG channels and views of blocks (see ``iterateSegments``).
+"""
+
+
+def createSegment(samples, step, hop, blockNumber, firstChannel, eegChannelNumber):
+    dataBlocks = sliding_window_view(samples, step, axis=0)[::hop][:blockNumber].transpose(0, 2, 1)
+    return {"samples": samples[:, firstChannel:firstChannel + eegChannelNumber],
+            "dataBlocks": dataBlocks,
+            "blocks": dataBlocks[:, :, firstChannel:firstChannel + eegChannelNumber].transpose(2, 0, 1)}
+
+
+"""
+Gathers parameters of the EEG examination and detection functions passed to functions in ``detectorRegistry``.
+Parameters:
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    lambdaFrequency : float
+        Lambda frequency value used in LFP detection.
+    nyquistFrequency : int
+        Nyquist frequency value used in LFP detection; by default equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency used in LFP detection.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+    thresholdModel : dict
+        Thresholds fitted over a cohort of examinations, None uses thresholds of the examination.
+    scale : ndarray
+        Value of one unit of integer EEG examination data in each channel, None for floating point data.
+Returns:
+    parameters : dict
+        Parameters by their names, with number of blocks and numbers of samples in a block ("blockLength") and between
+        starts of consecutive blocks ("hopLength"); "hopDuration" is resolved to ``blockDuration`` by default and "scale"
+        holds scale of EEG channels only.
+"""
+
+
+def createParameters(eegChannelNumber, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency,
+                     blockDuration, hopDuration, thresholdModel=None, scale=None):
+    if nyquistFrequency is None:
+        nyquistFrequency = samplingRate / 2
+    blockNumber, step, hop = getBlockParameters(examinationTime, samplingRate, blockDuration, hopDuration)
+    if hopDuration is None:
+        hopDuration = blockDuration
+    if scale is not None:
+        firstChannel = 1 if hasECGChannel(eegChannelNumber) else 0
+        scale = np.asarray(scale, dtype=np.float64)[firstChannel:firstChannel + eegChannelNumber]
+    return {"eegChannelNumber": eegChannelNumber, "examinationTime": examinationTime, "samplingRate": samplingRate,
+            "lambdaFrequency": lambdaFrequency, "nyquistFrequency": nyquistFrequency,
+            "electricFrequency": electricFrequency, "blockNumber": blockNumber, "blockLength": step, "hopLength": hop,
+            "blockDuration": blockDuration, "hopDuration": hopDuration, "thresholdModel": thresholdModel, "scale": scale}
+
+
+"""
+Calculates values of detection functions given by ``detectorNames`` on segments of blocks given by ``segments`` (see
+``iterateSegments``), on a pool of ``workers`` threads; NumPy, SciPy FFTs and Numba kernels release the GIL, so segments
+are measured in parallel. Segments are taken from ``segments`` as threads become free, at most twice as many as threads
+ahead of the values yielded, so a stream of blocks is not read into memory at once.
+Parameters:
+    segments : iterable
+        Segments of blocks of EEG examination data.
+    detectorNames : iterable
+        Names of detection functions in ``detectorRegistry``.
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+    workers : int
+        Number of threads; 1 measures segments in this thread, None uses all processors.
+Yields:
+    segmentFeatures : dict
+        Values of every detection function on blocks of a segment, by name of the detection function, in order of
+        segments.
+"""
+
+
+def measureSegments(segments, detectorNames, parameters, workers=1):
+    def measure(segment):
+        return {detectorName: detectorRegistry[detectorName]["measure"](segment, parameters)
+                for detectorName in detectorNames}
+
+    if workers == 1:
+        for segment in segments:
+            yield measure(segment)
+        return
+
+    if workers is None:
+        workers = os.cpu_count()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # values of segments are yielded in order of segments, whichever thread finishes first
+        pending = collections.deque()
+        for segment in segments:
+            pending.append(executor.submit(measure, segment))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+"""
+Calculates values of detection functions given by ``detectorNames`` on all blocks of EEG examination data given by
+``inputData``, without classifying the blocks, e.g. to fit thresholds over many examinations (see
+``thresholdCalculation/fitThresholdModel``). Parameters are the same as of ``performDetections``.
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    detectorNames : iterable
+        Names of detection functions in ``detectorRegistry``.
+    lambdaFrequency : float
+        Lambda frequency value used in LFP detection.
+    nyquistFrequency : int
+        Nyquist frequency value used in LFP detection; by default equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency used in LFP detection.
+    chunkBlocks : int
+        Number of blocks processed at once.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+    workers : int
+        Number of threads measuring blocks of data at once (see ``performDetections``).
+    scale : ndarray
+        Value of one unit of integer EEG examination data in each channel (see ``dataExtraction/quantizeData``); EEP
+        values are multiplied by it, so that they are in the units of thresholds fitted over a cohort. None for
+        floating point data.
+Returns:
+    features : dict
+        Values of every detection function on all blocks, along the last axis, by name of the detection function; None
+        when there are no blocks.
+"""
+
+
+def measureDetections(inputData, eegChannelNumber, examinationTime, samplingRate, detectorNames=("EEP", "LFP", "ECG"),
+                      lambdaFrequency=0.625, nyquistFrequency=None, electricFrequency=50, chunkBlocks=64,
+                      blockDuration=4, hopDuration=None, workers=1, scale=None):
+    parameters = createParameters(eegChannelNumber, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency,
+                                  electricFrequency, blockDuration, hopDuration, scale=scale)
+
+    # calculating values of every detection function on every segment of blocks
+    featureLists = {detectorName: [] for detectorName in detectorNames}
+    segments = iterateSegments(inputData, eegChannelNumber, examinationTime, samplingRate, chunkBlocks, blockDuration, hopDuration)
+    for segmentFeatures in measureSegments(segments, detectorNames, parameters, workers):
+        for detectorName in detectorNames:
+            featureLists[detectorName].append(segmentFeatures[detectorName])
+
+    # concatenating values of all segments
+    return {detectorName: np.concatenate(featureList, axis=-1) if featureList else None
+            for detectorName, featureList in featureLists.items()}
+
+
+"""
+Performs detection functions given by ``detectorNames`` on EEG examination data given by ``inputData`` in one pass.
+Data are divided into blocks once and views of the blocks, as well as spectra calculated on them, are shared by all
+detection functions.
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    detectorNames : iterable
+        Names of detection functions in ``detectorRegistry``.
+    lambdaFrequency : float
+        Lambda frequency value used in LFP detection.
+    nyquistFrequency : int
+        Nyquist frequency value used in LFP detection; by default equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency used in LFP detection.
+    chunkBlocks : int
+        Number of blocks processed at once.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``, shorter hops make
+        blocks overlap.
+    thresholdModel : dict
+        Thresholds fitted over a cohort of examinations (see ``thresholdCalculation/fitThresholdModel``), used instead
+        of thresholds of this examination; None uses thresholds of this examination.
+    workers : int
+        Number of threads measuring segments of blocks at once; 1 measures them in this thread, None uses all
+        processors. Segments are time chunks of ``chunkBlocks`` blocks, the same as measured one by one, so results
+        do not depend on the number of threads.
+    scale : ndarray
+        Value of one unit of integer EEG examination data in each channel (see ``dataExtraction/quantizeData``); EEP
+        values are multiplied by it, so that they are in the units of thresholds fitted over a cohort. None for
+        floating point data.
+Returns:
+    results : dict
+        Boolean matrices informing about artifact occurrence in each block, one row per channel (one row for ECG, none
+        when EEG examination data have no ECG channel), by name of the detection function.
+    isArtifactOutput : list
+        List of boolean values informing about occurrence of any of artifacts in each block of EEG examination data.
+"""
+
+
+def performDetections(inputData, eegChannelNumber, examinationTime, samplingRate, detectorNames=("EEP", "LFP", "ECG"),
+                      lambdaFrequency=0.625, nyquistFrequency=None, electricFrequency=50, chunkBlocks=64,
+                      blockDuration=4, hopDuration=None, thresholdModel=None, workers=1, scale=None):
+    parameters = createParameters(eegChannelNumber, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency,
+                                  electricFrequency, blockDuration, hopDuration, thresholdModel, scale)
+
+    # calculating values of every detection function on every segment of blocks
+    features = measureDetections(inputData, eegChannelNumber, examinationTime, samplingRate, detectorNames,
+                                 lambdaFrequency, nyquistFrequency, electricFrequency, chunkBlocks, blockDuration,
+                                 hopDuration, workers, scale)
+
+    # classifying all blocks and merging results of every detection function
+    blockNumber = parameters["blockNumber"]
+    results = {}
+    isArtifactOutput = np.zeros(blockNumber, dtype=bool)
+    for detectorName in detectorNames:
+        classify = detectorRegistry[detectorName]["classify"]
+        if features[detectorName] is not None:
+            results[detectorName] = classify(features[detectorName], parameters)
+        else:
+            results[detectorName] = np.zeros((0, blockNumber), dtype=bool)
+        isArtifactOutput[:results[detectorName].shape[1]] |= results[detectorName].any(axis=0)
+
+    # returning results of every detection function and list informing about occurrence of any of artifacts
+    return results, isArtifactOutput.tolist()
+
+
+"""
+Performs detection functions given by ``detectorNames`` on EEG examination data given by ``inputData`` online: blocks
+are classified as they arrive, with thresholds calculated from running statistics of blocks known so far (see
+``thresholdCalculation/RunningStatistics``), instead of all blocks of the examination. Statistics of the first
+``warmUpBlocks`` blocks are too uncertain to classify them, so they are held back and classified together when the
+warm-up ends, or when data end before it. Thresholds of a block include values of the block, like offline ones; because
+of that a single block can exceed the EEP thresholds (median + 6 standard deviations) only when more than about 40
+blocks are known, hence the default warm-up of 60 blocks (4 minutes). With thresholds fitted over a cohort of
+examinations, given by ``thresholdModel``, every block is classified as soon as it arrives. On synthetic examinations
+merged flags agree with flags of ``performDetections`` on every block and flags of single channels on more than 99% of
+them (see ``testingOnline.py``).
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data or blocks of it yielded by ``dataExtraction/iterateBlocks``.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    detectorNames : iterable
+        Names of detection functions in ``detectorRegistry``.
+    warmUpBlocks : int
+        Number of blocks held back until running statistics are known.
+    lambdaFrequency : float
+        Lambda frequency value used in LFP detection.
+    nyquistFrequency : int
+        Nyquist frequency value used in LFP detection; by default equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency used in LFP detection.
+    blockDuration : float
+        Duration of a block in seconds.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
+    thresholdModel : dict
+        Thresholds fitted over a cohort of examinations (see ``thresholdCalculation/fitThresholdModel``); None uses
+        thresholds of this examination.
+    scale : ndarray
+        Value of one unit of integer EEG examination data in each channel (see ``dataExtraction/quantizeData``); EEP
+        values are multiplied by it, so that they are in the units of thresholds fitted over a cohort. None for
+        floating point data.
+Yields:
+    blockIndex : int
+        Number of the block.
+    results : dict
+        Boolean values informing about artifact occurrence in the block, one value per channel (one value for ECG, none
+        when EEG examination data have no ECG channel), by name of the detection function.
+    isArtifact : bool
+        Boolean value informing about occurrence of any of artifacts in the block.
+"""
+
+
+def performOnlineDetections(inputData, eegChannelNumber, examinationTime, samplingRate, detectorNames=("EEP", "LFP", "ECG"),
+                            warmUpBlocks=60, lambdaFrequency=0.625, nyquistFrequency=None, electricFrequency=50,
+                            blockDuration=4, hopDuration=None, thresholdModel=None, scale=None):
+    parameters = createParameters(eegChannelNumber, examinationTime, samplingRate, lambdaFrequency, nyquistFrequency,
+                                  electricFrequency, blockDuration, hopDuration, thresholdModel, scale)
+    states = {detectorName: {} for detectorName in detectorNames}
+
+    # thresholds fitted over a cohort are known before the first block, so blocks are classified without a warm-up
+    if thresholdModel is not None:
+        for blockIndex, segment in enumerate(iterateSegments(inputData, eegChannelNumber, examinationTime, samplingRate, 1, blockDuration, hopDuration)):
+            results = {}
+            for detectorName in detectorNames:
+                features = detectorRegistry[detectorName]["measure"](segment, parameters)
+                results[detectorName] = detectorRegistry[detectorName]["classify"](features, parameters)[:, 0]
+            yield blockIndex, results, any(bool(result.any()) for result in results.values())
+        return
+
+    # values of blocks which are not classified yet
+    pendingBlocks = []
+    for blockIndex, segment in enumerate(iterateSegments(inputData, eegChannelNumber, examinationTime, samplingRate, 1, blockDuration, hopDuration)):
+        # calculating values of every detection function on the block and updating running statistics with them
+        features = {}
+        for detectorName in detectorNames:
+            features[detectorName] = detectorRegistry[detectorName]["measure"](segment, parameters)
+            detectorRegistry[detectorName]["update"](features[detectorName], states[detectorName], parameters)
+        pendingBlocks.append((blockIndex, features))
+
+        # classifying blocks once the warm-up ends
+        if blockIndex + 1 >= warmUpBlocks:
+            for result in flagBlocks(pendingBlocks, states, parameters):
+                yield result
+            pendingBlocks = []
+
+    # classifying blocks of data shorter than the warm-up
+    for result in flagBlocks(pendingBlocks, states, parameters):
+        yield result
+
+
+"""
+Classifies blocks given by ``blocks`` with thresholds of running statistics given by ``states``. Called inside the
+``performOnlineDetections`` function.
+Parameters:
+    blocks : list
+        Tuples containing number of the block and values of detection functions calculated on it, by their names.
+    states : dict
+        Running statistics of detection functions, by their names.
+    parameters : dict
+        Parameters of the EEG examination and detection functions.
+Yields:
+    blockIndex : int
+        Number of the block.
+    results : dict
+        Boolean values informing about artifact occurrence in the block, by name of the detection function.
+    isArtifact : bool
+        Boolean value informing about occurrence of any of artifacts in the block.
+"""
+
+
+def flagBlocks(blocks, states, parameters):
+    for blockIndex, features in blocks:
+        results = {}
+        for detectorName, detectorFeatures in features.items():
+            results[detectorName] = detectorRegistry[detectorName]["flag"](detectorFeatures, states[detectorName], parameters)[:, 0]
+        isArtifact = any(bool(result.any()) for result in results.values())
+        yield blockIndex, results, isArtifact
@@ -1,6 +1,10 @@
 import numpy as np
-from scipy.fft import fft
+from scipy.fft import fft, rfft
 import statistics
+import computeKernels
+
+# weights of Fourier-based function calculated by ``getFourierWeights``, by it's arguments
+fourierWeightsCache = {}
 
 
 """
@@ -37,6 +41,70 @@ def calculateStandardDeviation(data):
     return standardDeviation
 
 
+"""
+Converts integer data given by ``data``, e.g. scaled EEG examination data, to float32; floating point data are returned
+unchanged. Lets calculations on float32 and integer data run in single precision.
+Parameters:
+    data : ndarray
+        Fragment of EEG examination data.
+Returns:
+    floatData : ndarray
+        Floating point data.
+"""
+
+
+def asFloatArray(data):
+    data = np.asarray(data)
+    if np.issubdtype(data.dtype, np.floating):
+        return data
+    return data.astype(np.float32)
+
+
+"""
+Calculates decimal logarithm of absolute values of data given by ``data``; zero values are left as zeros. Necessary for
+performing ``thresholdCalculation/calculateThresholdsEEPArray`` function. Runs on backend chosen in ``computeKernels``.
+Parameters:
+    data : ndarray
+        Minimum or maximum values of blocks of EEG examination data.
+Returns:
+    logModulus : ndarray
+        Numpy ndarray of float64 values of the same shape as ``data``.
+"""
+
+
+def calculateLogModulus(data):
+    data = np.asarray(data, dtype=np.float64)
+    return computeKernels.getBackend()["logModulus"](data)
+
+
+"""
+Calculates minimum and maximum values of data given by ``data`` in ``windowNumber`` windows of ``windowLength`` samples,
+starting every ``hop`` samples; windows may overlap. Data are first reduced in pieces of the greatest common divisor of
+``windowLength`` and ``hop`` samples and windows are reduced from minima and maxima of their pieces, so every sample is
+read once however much windows overlap. Runs on backend chosen in ``computeKernels``.
+Parameters:
+    data : ndarray
+        EEG examination data, one row per sample.
+    windowLength : int
+        Number of samples in a window.
+    hop : int
+        Number of samples between starts of consecutive windows.
+    windowNumber : int
+        Number of windows.
+Returns:
+    extrema : tuple
+        Tuple containing ndarrays of minimum and maximum values, one row per window.
+"""
+
+
+def calculateSlidingExtrema(data, windowLength, hop, windowNumber):
+    data = np.asarray(data)
+    if windowNumber <= 0:
+        empty = np.zeros((0,) + data.shape[1:], dtype=data.dtype)
+        return empty, empty
+    return computeKernels.getBackend()["slidingExtrema"](data, windowLength, hop, windowNumber)
+
+
 """
 Calculates discrete Fourier transforms of data given by ``data``, it's absolute value and then it's square value. 
 Necessary for performing ``calculateFourierFunction`` function.
@@ -50,7 +118,7 @@ Returns:
 
 
 def calculateFourierSquareModulus(data):
-    fourier = fft(data)
+    fourier = fft(asFloatArray(data))
     fourierModulus = np.abs(fourier)
     fourierSquareModulus = np.square(fourierModulus)
     return fourierSquareModulus
@@ -107,6 +175,141 @@ def calculateFourierFunction(data, samplingRate, lambdaFrequency, nyquistFrequen
     return fourierFunction
 
 
+"""
+Calculates weights which turn power spectrum of real data, calculated with ``rfft``, into the sums of power spectrum
+elements used in ``calculateFourierFunction``. A weight is the number of elements of the whole power spectrum, selected
+by frequency limits of ``calculateFourierFunction``, which are equal to the element of the real data spectrum because of
+it's symmetry. Weights are calculated once for given arguments and cached.
+Parameters:
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    blockLength : int
+        Number of samples in a block of data.
+    lambdaFrequency : float
+        Lambda frequency value determined in EEGData class definition.
+    nyquistFrequency : int
+        Nyquist frequency value equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency determined in EEGData class definition.
+Returns:
+    fourierWeights : tuple
+        Tuple containing ndarrays of weights of the nominator and the denominator of Fourier-based function.
+"""
+
+
+def getFourierWeights(samplingRate, blockLength, lambdaFrequency, nyquistFrequency, electricFrequency):
+    key = (samplingRate, blockLength, lambdaFrequency, nyquistFrequency, electricFrequency)
+    if key not in fourierWeightsCache:
+        # frequency values assigned to elements of the whole power spectrum, the same as in calculateFourierFunction
+        frequency = np.linspace(0, samplingRate/2, blockLength)
+
+        # element of the real data spectrum equal to each element of the whole power spectrum
+        index = np.arange(blockLength)
+        realIndex = np.minimum(index, blockLength - index)
+        realLength = blockLength // 2 + 1
+
+        # counting selected elements of the whole power spectrum
+        nominatorWeights = np.bincount(realIndex[frequency < lambdaFrequency], minlength=realLength)
+        denominatorWeights = np.bincount(realIndex[frequency < nyquistFrequency], minlength=realLength) - \
+            np.bincount(realIndex[(frequency > (electricFrequency-2)) & (frequency < (electricFrequency+2))],
+                        minlength=realLength)
+        fourierWeightsCache[key] = (nominatorWeights.astype(np.float64), denominatorWeights.astype(np.float64))
+    return fourierWeightsCache[key]
+
+
+"""
+Calculates values of Fourier-based function on many blocks of data given by ``data`` at once, using one real FFT. Gives
+the same values as ``calculateFourierFunction`` called on every block.
+Parameters:
+    data : ndarray
+        Blocks of EEG examination data, samples of a block along the last axis.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    lambdaFrequency : float
+        Lambda frequency value determined in EEGData class definition.
+    nyquistFrequency : int
+        Nyquist frequency value equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency determined in EEGData class definition.
+Returns:
+    fourierFunction : ndarray
+        Fourier-based function values of every block, of shape of ``data`` without the last axis.
+"""
+
+
+def calculateFourierFunctionArray(data, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency):
+    powerSpectrum = calculatePowerSpectrumArray(data)
+    return calculateFourierFunctionSpectrum(powerSpectrum, data.shape[-1], samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency)
+
+
+"""
+Calculates power spectrum of many blocks of data given by ``data`` at once, using one real FFT; only elements of
+non-negative frequencies are calculated.
+Parameters:
+    data : ndarray
+        Blocks of EEG examination data, samples of a block along the last axis.
+Returns:
+    powerSpectrum : ndarray
+        Square modulus of real FFT of every block.
+"""
+
+
+def calculatePowerSpectrumArray(data):
+    return np.square(np.abs(rfft(asFloatArray(data), axis=-1)))
+
+
+"""
+Calculates values of Fourier-based function given power spectra of blocks of data by ``powerSpectrum`` (see
+``calculatePowerSpectrumArray``), so that spectra can be shared with other calculations. Sums of spectra run on backend
+chosen in ``computeKernels``.
+Parameters:
+    powerSpectrum : ndarray
+        Power spectra of blocks of EEG examination data, calculated with real FFT.
+    blockLength : int
+        Number of samples in a block of data.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    lambdaFrequency : float
+        Lambda frequency value determined in EEGData class definition.
+    nyquistFrequency : int
+        Nyquist frequency value equal to half of sampling rate.
+    electricFrequency : int
+        Electric network frequency determined in EEGData class definition.
+Returns:
+    fourierFunction : ndarray
+        Fourier-based function values of every block, of shape of ``powerSpectrum`` without the last axis.
+"""
+
+
+def calculateFourierFunctionSpectrum(powerSpectrum, blockLength, samplingRate, lambdaFrequency, nyquistFrequency, electricFrequency):
+    # calculating sums of powerSpectrum elements with weights of selected frequencies
+    # Fourier-based function values are equal to zero where nominator is zero
+    nominatorWeights, denominatorWeights = getFourierWeights(samplingRate, blockLength, lambdaFrequency, nyquistFrequency, electricFrequency)
+    return computeKernels.getBackend()["fourierFunction"](powerSpectrum, nominatorWeights, denominatorWeights)
+
+
+"""
+Calculates Pearson correlation coefficients of many channels given by ``data`` with reference channel given by
+``reference`` at once, from sums of centred values. Coefficients of constant channels, and of all channels when the
+reference is constant, are not defined and equal to NaN, the same as returned by ``scipy.stats.pearsonr``. Runs on
+backend chosen in ``computeKernels``.
+Parameters:
+    data : ndarray
+        Blocks of EEG examination data of shape (..., channels, samples in a block).
+    reference : ndarray
+        Blocks of reference channel of shape (..., samples in a block).
+Returns:
+    coefficients : ndarray
+        Correlation coefficients of shape (..., channels).
+"""
+
+
+def calculateCorrelationArray(data, reference):
+    data = np.asarray(data, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    return computeKernels.getBackend()["correlation"](data, reference)
+
+
 """
 Helps in sorting list of elements by measuring length of path to the file, being an element, given by ``item``. 
 Necessary for performing ``EEGPreprocessing/showPlot`` function.
@@ -0,0 +1,156 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib
+matplotlib.use('Agg')  # workers only save figures
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+import dataExtraction
+import processing_func
+import artifactDetection
+import fileCreating
+import thresholdCalculation
+
+
+def process_file(file, settings, tag_time):
+    # process one recording; every result file is named after the recording, so workers never share a file
+    # tag_time holds times of the tag in the description of the recording (None when there is no description)
+    # returns ('processed' | 'skipped', message), exceptions are reported by run_batch
+
+    print(file)
+    name = file.split('.')[0]
+
+    ## EXTRACT SIGNAL
+    print('reading data')
+    if not dataExtraction.checkFile(settings['dataPath'] + file):
+        return 'skipped', 'not an EEG examination file'
+    recording = dataExtraction.Recording(settings['dataPath'] + file, useCache=True, dtype=settings['sample_dtype'])
+    # samples are loaded before the duration is read, which then comes from them instead of a second pass over the file
+    recording.inputData
+
+    ## DETECT ARTIFACTS
+    # all chosen detectors share one pass over the recording, a block is marked when any of them finds an artifact
+    output = artifactDetection.performDetections(recording, recording.eegChannelNumber, recording.examinationTime, recording.samplingRate, settings['detectors'], blockDuration=settings['block_duration'], hopDuration=settings['hop_duration'], thresholdModel=settings['threshold_model'], workers=settings['detection_workers'], scale=recording.scale)
+    isArtifactList = output[1]
+    array = fileCreating.markArtifacts(isArtifactList, recording.samplingRate, settings['block_duration'], settings['hop_duration'])
+    fileCreating.createFile(array, os.path.join(settings['resultsPath'], name + '_artifacts.txt'))
+
+    ## EXTRACT SIGNAL PARAMETERS
+    sampling_rate = recording.samplingRate
+
+    ## FIND TIME STAMPS FOR TAGS IN DESCRIPTION DATA
+    print('looking for tags in signal')
+    if tag_time is None:
+        return 'skipped', 'no matching description file found'
+    if not tag_time['start']:
+        return 'skipped', 'no tags found in description file'
+
+    ## GET FRAMES FROM SIGNAL
+    print('extracting frames')
+    # epochs are read-only views of the recording, copied only to be stored
+    epoch_index, epochs = processing_func.get_tag_epochs(name, recording, sampling_rate, settings['epoch_size'], settings['overlap'], tag_time)
+
+    # store frames in binary frame store (NPY array and JSON index)
+    print('saving frames into frame store')
+    # an empty store keeps the shape of an epoch: all columns of the recording and two steps of overlap seconds
+    epoch_shape = (recording.getSamples(0, 1).shape[1], 2 * round(settings['overlap']) * sampling_rate)
+    processing_func.save_frame_store(settings['framesPath'], name, epoch_index, epochs, tag_time, sampling_rate, epoch_shape, recording.dtype)
+
+    # if not processed open frame store, frames are memory mapped
+    # print('loading frames from frame store')
+    # frame_index, epochs = processing_func.load_frame_store(settings['framesPath'], name)
+
+    ## GET SPECTRAL DATA FROM FRAME
+    print('estimating peak frequency for brain waves')
+    peak_results = processing_func.get_peak_results(name, epochs, settings['epoch_size'], sampling_rate, settings['channelsNames'], settings['brain_waves'], settings['butter_degree'], settings['sample_dtype'])
+    # save results
+    peak_results.to_csv(os.path.join(settings['resultsWavePath'], name + '.csv'), index=True)
+
+    ## PLOT SPECTRAL DATA
+    print('plotting results')
+    data_to_plot = peak_results[['channel', 'gamma', 'beta', 'alpha', 'theta', 'delta']]
+    g = sns.pairplot(data_to_plot, hue='channel')
+    g.savefig(os.path.join(settings['resultsWavePath'], name + "_hist.png"))
+    plt.close('all')
+
+    ## basic statistics
+    # result_main = data_to_plot.groupby([str('channel')]).mean()
+    # print(result_main)
+    # result_std = data_to_plot.groupby([str('channel')]).std()
+    # print(result_std)
+
+    return 'processed', ''
+
+
+def measure_file(file, settings):
+    # calculate values of detectors on one recording, for fitting the cohort threshold model; values of integer
+    # samples are multiplied by their scale, so that they are pooled in the same units
+    # returns (number of EEG channels, values by detector, sampling rate) or None for files which are not EEG examinations
+
+    if not dataExtraction.checkFile(settings['dataPath'] + file):
+        return None
+    recording = dataExtraction.Recording(settings['dataPath'] + file, useCache=True, dtype=settings['sample_dtype'])
+    recording.inputData  # the duration is taken from the loaded samples
+    features = artifactDetection.measureDetections(recording, recording.eegChannelNumber, recording.examinationTime, recording.samplingRate, settings['detectors'], blockDuration=settings['block_duration'], hopDuration=settings['hop_duration'], workers=settings['detection_workers'], scale=recording.scale)
+    return recording.eegChannelNumber, features, recording.samplingRate
+
+
+def fit_threshold_model(fileList, settings, model_path, n_workers=None):
+    # fit thresholds of detectors over all recordings at once and store them in model_path
+    # values of every recording are calculated on a pool of n_workers processes (1 runs in this process)
+
+    print('fitting threshold model on %d recordings' % len(fileList))
+    if n_workers == 1:
+        recording_features = [measure_file(file, settings) for file in fileList]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            recording_features = list(executor.map(measure_file, fileList, [settings] * len(fileList)))
+    recording_features = [features for features in recording_features if features is not None]
+
+    # thresholds hold only for the sampling rate they were fitted on
+    sampling_rates = sorted(set(sampling_rate for _, _, sampling_rate in recording_features))
+    if len(sampling_rates) > 1:
+        raise ValueError('threshold model needs recordings of one sampling rate, found %s' % sampling_rates)
+    sampling_rate = sampling_rates[0] if sampling_rates else None
+    recording_features = [(channel_number, features) for channel_number, features, _ in recording_features]
+
+    threshold_model = thresholdCalculation.fitThresholdModel(recording_features, settings['block_duration'], settings['hop_duration'], sampling_rate)
+    thresholdCalculation.saveThresholdModel(threshold_model, model_path)
+    return threshold_model
+
+
+def run_batch(fileList, settings, n_workers=None):
+    # process recordings on a pool of n_workers processes (all cores by default, 1 runs in this process);
+    # a failure of one file is reported and does not stop the others
+
+    summary = {'processed': [], 'skipped': [], 'failed': []}
+
+    # tags are looked up here, so workers get only the times of their recording instead of the whole tag index
+    tag_times = {file: processing_func.get_indexed_time_tags(settings['tag_index'], file.split('.')[0], settings['tag_name']) for file in fileList}
+    settings = {key: value for key, value in settings.items() if key != 'tag_index'}
+
+    if n_workers == 1:
+        for file in fileList:
+            try:
+                status, message = process_file(file, settings, tag_times[file])
+            except Exception:
+                status, message = 'failed', traceback.format_exc()
+            summary[status].append((file, message))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = {executor.submit(process_file, file, settings, tag_times[file]): file for file in fileList}
+            for future in as_completed(futures):
+                try:
+                    status, message = future.result()
+                except Exception as error:
+                    status, message = 'failed', repr(error)
+                summary[status].append((futures[future], message))
+
+    ## PRINT SUMMARY
+    print('processed: %d, skipped: %d, failed: %d' % (len(summary['processed']), len(summary['skipped']), len(summary['failed'])))
+    for status in ['skipped', 'failed']:
+        for file, message in summary[status]:
+            print(status, file, message.strip().splitlines()[-1] if message.strip() else '')
+
+    return summary
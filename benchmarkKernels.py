@@ -0,0 +1,107 @@
+import time
+import numpy as np
+import auxiliaryFunctions as aF
+import computeKernels
+
+## PARAMETERS
+# synthetic recording similar to a 30 minutes examination of 21 channels sampled at 512 Hz
+samplingRate = 512
+examinationTime = 1800
+channelNumber = 21
+blockDuration = 4
+hopDuration = 1
+repeats = 5
+# largest difference of results of every backend from results of the numpy backend; extrema are selected, not calculated,
+# and the numba backend shares logarithm and Fourier-based function kernels, so they have to be identical, while
+# correlation sums samples in a different order
+tolerances = {"slidingExtrema": 0, "logModulus": 0, "fourierFunction": 0, "correlation": 1e-12}
+
+
+"""
+Measures the shortest time of ``repeats`` calls of function given by ``function``, after one call which is not measured
+(it compiles Numba kernels).
+Parameters:
+    function : function
+        Function called without arguments.
+Returns:
+    time : float
+        Shortest time of a call in seconds.
+"""
+
+
+def measureTime(function):
+    function()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+"""
+Creates calls of every kernel of a backend on synthetic data, through functions of ``auxiliaryFunctions``.
+Returns:
+    kernelCalls : dict
+        Functions calling kernels without arguments, by kernel name.
+"""
+
+
+def createKernelCalls():
+    generator = np.random.default_rng(0)
+    samples = generator.normal(0, 50, (samplingRate * examinationTime, channelNumber))
+    blockLength = samplingRate * blockDuration
+    hop = samplingRate * hopDuration
+    blockNumber = (samples.shape[0] - blockLength) // hop + 1
+
+    # blocks of every channel and of the reference channel, as used by detectors
+    blocks = np.lib.stride_tricks.sliding_window_view(samples, blockLength, axis=0)[::hop]
+    powerSpectrum = aF.calculatePowerSpectrumArray(blocks[:256].transpose(1, 0, 2))
+    minima = samples.reshape(-1, blockLength, channelNumber).min(axis=1)
+
+    return {
+        "slidingExtrema": lambda: aF.calculateSlidingExtrema(samples, blockLength, hop, blockNumber),
+        "logModulus": lambda: aF.calculateLogModulus(minima),
+        "fourierFunction": lambda: aF.calculateFourierFunctionSpectrum(powerSpectrum, blockLength, samplingRate, 0.625, samplingRate / 2, 50),
+        "correlation": lambda: aF.calculateCorrelationArray(blocks[:256, 1:], blocks[:256, 0]),
+    }
+
+
+if __name__ == "__main__":
+    backendNames = list(computeKernels.backendRegistry)
+    if "numba" not in backendNames:
+        print("Numba is not installed, only the numpy backend is measured")
+    kernelCalls = createKernelCalls()
+
+    print("%-16s" % "kernel" + "".join("%14s" % name for name in backendNames) + "%10s%16s" % ("speedup", "max difference"))
+    for kernelName, kernelCall in kernelCalls.items():
+        times = {}
+        results = {}
+        for backendName in backendNames:
+            computeKernels.setBackend(backendName)
+            times[backendName] = measureTime(kernelCall)
+            results[backendName] = kernelCall()
+
+        # comparing results of every backend with the numpy backend
+        difference = 0.0
+        reference = np.asarray(results["numpy"])
+        for backendName in backendNames:
+            result = np.asarray(results[backendName])
+            if not np.array_equal(np.isnan(result), np.isnan(reference)):
+                difference = np.inf
+            else:
+                difference = max(difference, float(np.nanmax(np.abs(result - reference), initial=0)))
+
+        speedup = times["numpy"] / times[backendNames[-1]]
+        print("%-16s" % kernelName + "".join("%12.2fms" % (1000 * times[name]) for name in backendNames) +
+              "%9.1fx%16.2g" % (speedup, difference))
+
+        # a backend whose results differ more than allowed fails the benchmark
+        for backendName in backendNames:
+            message = "%s kernel of %s backend differs from numpy backend" % (kernelName, backendName)
+            if tolerances[kernelName] == 0:
+                np.testing.assert_array_equal(results[backendName], results["numpy"], err_msg=message)
+            else:
+                np.testing.assert_allclose(results[backendName], results["numpy"], rtol=tolerances[kernelName],
+                                           atol=tolerances[kernelName], equal_nan=True, err_msg=message)
+    computeKernels.setBackend()
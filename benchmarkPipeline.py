@@ -0,0 +1,139 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import dataExtraction
+import artifactDetection
+import processing_func
+import syntheticData
+from main import tag_name, epoch_size, overlap, butter_degree, brain_waves
+
+## PARAMETERS
+# durations of synthetic recordings in seconds, each is written in ASC and TXT format
+examinationTimes = [60, 300, 900]
+samplingRate = 512
+# number of artifacts injected per minute of a recording
+artifactRate = 1
+
+
+"""
+Measures time of a call of function given by ``function`` and, in a second call traced by ``tracemalloc``, the peak
+memory allocated by it (NumPy arrays included); printed output of the function is suppressed.
+Parameters:
+    function : function
+        Function called without arguments.
+Returns:
+    result : any
+        Value returned by the function.
+    time : float
+        Time of the call in seconds.
+    peakMemory : int
+        Peak memory allocated during the call in bytes.
+"""
+
+
+def measureStage(function):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        function()
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peakMemory
+
+
+"""
+Creates synthetic recording of ``examinationTime`` seconds in the format given by ``fileFormat`` and it's description
+file, with eyes closed and opened every minute, in the directory given by ``directory``.
+Parameters:
+    directory : string
+        Path to the directory.
+    fileFormat : string
+        Format of the recording, "asc" or "txt".
+    examinationTime : int
+        Duration of the recording in seconds.
+Returns:
+    paths : tuple
+        Paths to the recording and to it's description file.
+"""
+
+
+def createFiles(directory, fileFormat, examinationTime):
+    path = os.path.join(directory, "synthetic%d.%s" % (examinationTime, fileFormat))
+    descPath = os.path.join(directory, "synthetic%d_desc.txt" % examinationTime)
+    eegChannelNumber = len(syntheticData.ascChannelsNames if fileFormat == "asc" else dataExtraction.txtChannelsNames)
+    types = ("EEP", "LFP", "ECG") if fileFormat == "asc" else ("EEP", "LFP")
+    artifacts = syntheticData.placeArtifacts(examinationTime, eegChannelNumber, artifactRate * examinationTime // 60, types)
+    syntheticData.createRecording(path, examinationTime, samplingRate, artifacts, breakNumber=2, shortRate=0.01,
+                                  ampsatRate=0.001)
+
+    events = []
+    for minute in range(examinationTime // 60):
+        events.append((60 * minute + 5, tag_name))
+        events.append((60 * minute + 45, "Oczy otwarte"))
+    syntheticData.writeDescription(descPath, events)
+    return path, descPath
+
+
+"""
+Runs stages of processing of one recording given by ``path``, with description file given by ``descPath``, and prints
+their times, throughput in seconds of the recording processed per second and peak memory. A failing stage is reported
+and stages depending on it are skipped. Frames are cut both by ``get_tag_epochs``, used by the pipeline, and by the
+superseded ``get_tag_frames``, for comparison; the stages after them use the epochs.
+Parameters:
+    path : string
+        Path to the recording.
+    descPath : string
+        Path to the description file.
+    examinationTime : int
+        Duration of the recording in seconds.
+"""
+
+
+def benchmarkRecording(path, descPath, examinationTime):
+    fileFormat = path.rsplit(".", 1)[1]
+    tag_time = processing_func.find_tag_times(processing_func.read_desc_events(descPath), tag_name)
+    framesPath, name = os.path.split(os.path.splitext(path)[0])
+    stages = [
+        ("extractData", lambda: dataExtraction.extractData(path)),
+        ("performEEPDetection", lambda: artifactDetection.performEEPDetection(data[0], data[4], data[1], data[2])),
+        ("performLFPDetection", lambda: artifactDetection.performLFPDetection(data[0], data[4], data[1], data[2], 0.625, data[2] / 2, 50)),
+        ("performECGDetection", lambda: artifactDetection.performECGDetection(data[0], data[4], data[1], data[2])),
+        ("get_tag_epochs", lambda: processing_func.get_tag_epochs(path, data[0].T, data[2], epoch_size, overlap, tag_time)),
+        # nested lists of frames, which the pipeline used before epochs were stored as arrays
+        ("get_tag_frames", lambda: processing_func.get_tag_frames(path, data[0].T, data[2], epoch_size, overlap, tag_time)),
+        ("save_frame_store", lambda: processing_func.save_frame_store(framesPath, name, *frames, tag_time, data[2])),
+        ("load_frame_store", lambda: processing_func.load_frame_store(framesPath, name)),
+        ("get_peak_results", lambda: processing_func.get_peak_results(path, frames[1], epoch_size, data[2], data[3], brain_waves, butter_degree)),
+    ]
+
+    # stages use the data and frames returned by the stages before them
+    data = frames = None
+    for stageName, stage in stages:
+        try:
+            result, elapsed, peakMemory = measureStage(stage)
+        except Exception as error:
+            print("%-4s%8d  %-22s failed: %r" % (fileFormat, examinationTime, stageName, error))
+            if stageName in ("extractData", "get_tag_epochs"):
+                break
+            continue
+        if stageName == "extractData":
+            data = result
+        elif stageName == "get_tag_epochs":
+            frames = result
+        print("%-4s%8d  %-22s%10.3f%12.1f%12.1f" % (fileFormat, examinationTime, stageName, elapsed,
+                                                     examinationTime / elapsed, peakMemory / 2 ** 20))
+
+
+if __name__ == "__main__":
+    print("%-4s%8s  %-22s%10s%12s%12s" % ("", "seconds", "stage", "time [s]", "x real time", "memory [MB]"))
+    with tempfile.TemporaryDirectory() as directory:
+        for examinationTime in examinationTimes:
+            for fileFormat in ["asc", "txt"]:
+                path, descPath = createFiles(directory, fileFormat, examinationTime)
+                benchmarkRecording(path, descPath, examinationTime)
@@ -0,0 +1,269 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Numba is optional, kernels compiled with it are used when it is installed
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+"""
+Calculates minimum and maximum values of data given by ``data`` in ``windowNumber`` windows of ``windowLength`` samples,
+starting every ``hop`` samples, with NumPy (see ``auxiliaryFunctions/calculateSlidingExtrema``).
+Parameters:
+    data : ndarray
+        EEG examination data, one row per sample.
+    windowLength : int
+        Number of samples in a window.
+    hop : int
+        Number of samples between starts of consecutive windows.
+    windowNumber : int
+        Number of windows.
+Returns:
+    extrema : tuple
+        Tuple containing ndarrays of minimum and maximum values, one row per window.
+"""
+
+
+def slidingExtremaNumpy(data, windowLength, hop, windowNumber):
+    # reducing pieces of data
+    pieceLength = math.gcd(windowLength, hop)
+    pieceNumber = ((windowNumber - 1) * hop + windowLength) // pieceLength
+    pieces = data[:pieceNumber * pieceLength].reshape((pieceNumber, pieceLength) + data.shape[1:])
+    pieceMinima = pieces.min(axis=1)
+    pieceMaxima = pieces.max(axis=1)
+
+    # reducing pieces of every window
+    windowPieces = windowLength // pieceLength
+    hopPieces = hop // pieceLength
+    minima = sliding_window_view(pieceMinima, windowPieces, axis=0)[::hopPieces].min(axis=-1)
+    maxima = sliding_window_view(pieceMaxima, windowPieces, axis=0)[::hopPieces].max(axis=-1)
+    return minima, maxima
+
+
+"""
+Calculates decimal logarithm of absolute values of float64 data given by ``data`` with NumPy; zero values are left as
+zeros (see ``auxiliaryFunctions/calculateLogModulus``).
+Parameters:
+    data : ndarray
+        Minimum or maximum values of blocks of EEG examination data.
+Returns:
+    logModulus : ndarray
+        Numpy ndarray of float64 values of the same shape as ``data``.
+"""
+
+
+def logModulusNumpy(data):
+    logModulus = np.zeros(data.shape)
+    np.log10(np.abs(data), out=logModulus, where=data != 0)
+    return logModulus
+
+
+"""
+Calculates values of Fourier-based function from power spectra given by ``powerSpectrum`` and weights of selected
+frequencies with NumPy (see ``auxiliaryFunctions/calculateFourierFunctionSpectrum``).
+Parameters:
+    powerSpectrum : ndarray
+        Power spectra of blocks of EEG examination data, calculated with real FFT.
+    nominatorWeights : ndarray
+        Weights of elements of power spectrum in the nominator.
+    denominatorWeights : ndarray
+        Weights of elements of power spectrum in the denominator.
+Returns:
+    fourierFunction : ndarray
+        Fourier-based function values of every block, of shape of ``powerSpectrum`` without the last axis.
+"""
+
+
+def fourierFunctionNumpy(powerSpectrum, nominatorWeights, denominatorWeights):
+    nominator = powerSpectrum @ nominatorWeights
+    denominator = powerSpectrum @ denominatorWeights
+
+    # calculating Fourier-based function values, equal to zero where nominator is zero
+    fourierFunction = np.zeros(nominator.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(nominator, denominator, out=fourierFunction, where=nominator != 0)
+    return fourierFunction
+
+
+"""
+Calculates Pearson correlation coefficients of float64 channels given by ``data`` with reference channel given by
+``reference`` with NumPy (see ``auxiliaryFunctions/calculateCorrelationArray``).
+Parameters:
+    data : ndarray
+        Blocks of EEG examination data of shape (..., channels, samples in a block).
+    reference : ndarray
+        Blocks of reference channel of shape (..., samples in a block).
+Returns:
+    coefficients : ndarray
+        Correlation coefficients of shape (..., channels).
+"""
+
+
+def correlationNumpy(data, reference):
+    reference = reference[..., np.newaxis, :]
+
+    # centring channels and calculating sums of their products
+    dataCentred = data - data.mean(axis=-1, keepdims=True)
+    referenceCentred = reference - reference.mean(axis=-1, keepdims=True)
+    covariance = np.sum(dataCentred * referenceCentred, axis=-1)
+    norm = np.sqrt(np.sum(np.square(dataCentred), axis=-1) * np.sum(np.square(referenceCentred), axis=-1))
+
+    # channels equal to their first value are constant, even if centring left rounding errors
+    isConstant = np.all(data == data[..., :1], axis=-1) | np.all(reference == reference[..., :1], axis=-1)
+
+    # calculating coefficients, limited to [-1, 1] like in ``scipy.stats.pearsonr``
+    coefficients = np.full(covariance.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(covariance, norm, out=coefficients, where=~isConstant)
+    return np.clip(coefficients, -1, 1)
+
+
+"""
+Compiles kernels with Numba. Kernels loop over rows of two- or three-dimensional arrays; functions returned wrap them so
+that they take and return arrays of the same shapes as NumPy kernels. Compiled code is cached next to this file, so
+that worker processes do not compile it again, and releases the GIL, so that threads run kernels in parallel.
+Returns:
+    kernels : dict
+        Kernels by their names, the same as in ``backendRegistry["numpy"]``.
+"""
+
+
+def createNumbaKernels():
+    @numba.njit(cache=True, nogil=True)
+    def reduceExtrema(data, pieceLength, windowPieces, hopPieces, windowNumber):
+        columnNumber = data.shape[1]
+        pieceNumber = (windowNumber - 1) * hopPieces + windowPieces
+        pieceMinima = np.empty((pieceNumber, columnNumber), dtype=data.dtype)
+        pieceMaxima = np.empty((pieceNumber, columnNumber), dtype=data.dtype)
+
+        # reducing pieces of data row by row; a NaN value is kept, the same as by ``np.min`` and ``np.max``
+        for piece in range(pieceNumber):
+            pieceMinima[piece] = data[piece * pieceLength]
+            pieceMaxima[piece] = data[piece * pieceLength]
+            for row in range(piece * pieceLength + 1, (piece + 1) * pieceLength):
+                for column in range(columnNumber):
+                    value = data[row, column]
+                    if value < pieceMinima[piece, column] or value != value:
+                        pieceMinima[piece, column] = value
+                    if value > pieceMaxima[piece, column] or value != value:
+                        pieceMaxima[piece, column] = value
+
+        # reducing pieces of every window
+        minima = np.empty((windowNumber, columnNumber), dtype=data.dtype)
+        maxima = np.empty((windowNumber, columnNumber), dtype=data.dtype)
+        for window in range(windowNumber):
+            start = window * hopPieces
+            minima[window] = pieceMinima[start]
+            maxima[window] = pieceMaxima[start]
+            for piece in range(start + 1, start + windowPieces):
+                for column in range(columnNumber):
+                    value = pieceMinima[piece, column]
+                    if value < minima[window, column] or value != value:
+                        minima[window, column] = value
+                    value = pieceMaxima[piece, column]
+                    if value > maxima[window, column] or value != value:
+                        maxima[window, column] = value
+        return minima, maxima
+
+    @numba.njit(cache=True, nogil=True)
+    def reduceCorrelation(data, reference):
+        blockNumber, channelNumber, sampleNumber = data.shape
+        coefficients = np.full((blockNumber, channelNumber), np.nan)
+        for block in range(blockNumber):
+            # centring reference channel once for all channels of the block
+            referenceMean = 0.0
+            isReferenceConstant = True
+            for sample in range(sampleNumber):
+                referenceMean += reference[block, sample]
+                isReferenceConstant = isReferenceConstant and reference[block, sample] == reference[block, 0]
+            if isReferenceConstant:
+                continue
+            referenceMean /= sampleNumber
+            referenceSquares = 0.0
+            for sample in range(sampleNumber):
+                referenceSquares += (reference[block, sample] - referenceMean) ** 2
+
+            for channel in range(channelNumber):
+                mean = 0.0
+                isConstant = True
+                for sample in range(sampleNumber):
+                    mean += data[block, channel, sample]
+                    isConstant = isConstant and data[block, channel, sample] == data[block, channel, 0]
+                if isConstant:
+                    continue
+                mean /= sampleNumber
+                covariance = 0.0
+                squares = 0.0
+                for sample in range(sampleNumber):
+                    centred = data[block, channel, sample] - mean
+                    covariance += centred * (reference[block, sample] - referenceMean)
+                    squares += centred * centred
+                coefficients[block, channel] = min(max(covariance / np.sqrt(squares * referenceSquares), -1.0), 1.0)
+        return coefficients
+
+    def slidingExtremaNumba(data, windowLength, hop, windowNumber):
+        pieceLength = math.gcd(windowLength, hop)
+        minima, maxima = reduceExtrema(data.reshape(data.shape[0], -1), pieceLength, windowLength // pieceLength,
+                                       hop // pieceLength, windowNumber)
+        return minima.reshape((windowNumber,) + data.shape[1:]), maxima.reshape((windowNumber,) + data.shape[1:])
+
+    def correlationNumba(data, reference):
+        shape = np.broadcast_shapes(data.shape[:-2], reference.shape[:-1])
+        data = np.broadcast_to(data, shape + data.shape[-2:]).reshape((-1,) + data.shape[-2:])
+        reference = np.broadcast_to(reference, shape + reference.shape[-1:]).reshape(-1, reference.shape[-1])
+        return reduceCorrelation(data, reference).reshape(shape + data.shape[1:2])
+
+    # logarithms and weighted sums of spectra are not faster compiled, they stay vectorized NumPy operations
+    return {"slidingExtrema": slidingExtremaNumba, "logModulus": logModulusNumpy,
+            "fourierFunction": fourierFunctionNumpy, "correlation": correlationNumba}
+
+
+# kernels of every available backend by backend name; Numba kernels are compiled at their first call
+backendRegistry = {"numpy": {"slidingExtrema": slidingExtremaNumpy, "logModulus": logModulusNumpy,
+                             "fourierFunction": fourierFunctionNumpy, "correlation": correlationNumpy}}
+if numba is not None:
+    backendRegistry["numba"] = createNumbaKernels()
+
+# name of the backend used by ``auxiliaryFunctions``, Numba when it is installed
+backendName = "numba" if "numba" in backendRegistry else "numpy"
+
+
+"""
+Chooses backend used by ``auxiliaryFunctions`` in this process.
+Parameters:
+    name : string
+        Name of the backend, "numpy" or "numba"; None chooses Numba when it is installed.
+"""
+
+
+def setBackend(name=None):
+    global backendName
+    if name is None:
+        name = "numba" if "numba" in backendRegistry else "numpy"
+    if name not in backendRegistry:
+        raise ValueError("Compute backend " + str(name) + " is not available, available backends: " +
+                         ", ".join(backendRegistry))
+    backendName = name
+
+
+"""
+Returns kernels of the backend given by ``name``.
+Parameters:
+    name : string
+        Name of the backend; None returns the backend chosen with ``setBackend``.
+Returns:
+    kernels : dict
+        Kernels by their names: "slidingExtrema", "logModulus", "fourierFunction" and "correlation".
+"""
+
+
+def getBackend(name=None):
+    if name is None:
+        name = backendName
+    if name not in backendRegistry:
+        raise ValueError("Compute backend " + str(name) + " is not available, available backends: " +
+                         ", ".join(backendRegistry))
+    return backendRegistry[name]
@@ -1,5 +1,37 @@
+import io
+import itertools
+import json
+import os
 import numpy as np
 
+# number of lines at the beginning of ASC file containing information about the examination
+ascInformLines = 11
+
+# number of lines read from ASC file and parsed at once when the file is read block by block
+ascChunkLines = 16384
+
+# following values are hardcoded because TXT file structure is weird and there is no possibility to simply read them;
+# values written below are received from people working with new EEG devices generating such output files
+txtChannelsNames = ["C3", "C4", "Cz", "F3", "F4", "F7", "F8", "Fz", "Fp1", "Fp2", "O1",
+                    "O2", "Oz", "P3", "P4", "T5", "T6", "Pz", "T3", "T4"]
+
+# number of lines at the beginning of TXT file containing information about the examination
+txtInformLines = 15
+
+# number of columns preceding and following EEG values in each data line of TXT file
+txtLeadingColumns = 4
+txtTrailingColumns = 42
+
+# number of lines read from TXT file and parsed at once
+txtChunkLines = 16384
+
+# line inserted into TXT file wherever the recording was interrupted
+breakLine = "--- BREAK IN DATA ---"
+
+# number of samples between byte offsets stored in the sample index of a file
+indexStride = 512
+
+
 """
 Checks if file, whose path is given by ``path``, contains EEG examination data.
 Parameters:
@@ -42,32 +74,242 @@ def checkFile(path):
 
 
 """
-Calls function reading data from file, whose path is given by ``path``, depending on file format.
+Calls function reading data from file, whose path is given by ``path``, depending on file format. When ``useCache`` is
+set, data read from the file are kept in a binary cache and read from it as long as the file is not changed.
 Parameters:
     path : string
         Path to the file which has to be read.
+    useCache : bool
+        Boolean value informing if the binary cache has to be used.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+    dtype : data-type
+        Data type of returned EEG examination data: float64, float32 or int16. Integer data are scaled separately in
+        each channel (see ``quantizeData``), the scale is returned by ``extractScaledData``.
 Returns:
     tup : tuple 
         Tuple of values read from file by reading function.     
 """
 
 
-def extractData(path):
+def extractData(path, useCache=False, cacheDir=None, dtype=float):
+    return extractScaledData(path, useCache, cacheDir, dtype)[0]
+
+
+"""
+Works as ``extractData`` and additionally returns the scale of integer EEG examination data.
+Parameters:
+    path : string
+        Path to the file which has to be read.
+    useCache : bool
+        Boolean value informing if the binary cache has to be used.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+    dtype : data-type
+        Data type of returned EEG examination data: float64, float32 or int16.
+Returns:
+    tup : tuple 
+        Tuple of values read from file by reading function.     
+    scale : ndarray
+        Value of one unit of integer data in each channel, None for floating point data.
+"""
+
+
+def extractScaledData(path, useCache=False, cacheDir=None, dtype=float):
+    if useCache:
+        tup = loadCache(path, cacheDir, dtype)
+        if tup is not None:
+            scale = loadCacheMetadata(path, cacheDir, dtype)["scale"]
+            return tup, (None if scale is None else np.array(scale, dtype=np.float32))
+
+    # integer data are read as float32 and scaled when the range of each channel is known
+    readDtype = np.float32 if np.issubdtype(dtype, np.integer) else dtype
     if path.endswith("asc"):
-        tup = extractDataAsc(path)
+        tup = extractDataAsc(path, readDtype)
     elif path.endswith("txt"):
-        tup = extractDataTxt(path)
-    return tup
+        tup = extractDataTxt(path, readDtype)
+    scale = None
+    if np.issubdtype(dtype, np.integer):
+        inputData, scale = quantizeData(tup[0], dtype)
+        tup = (inputData,) + tup[1:]
+
+    if useCache:
+        saveCache(path, tup, cacheDir, scale)
+    return tup, scale
+
+
+"""
+Converts EEG examination data given by ``inputData`` to integers of type ``dtype``. Each channel is scaled separately,
+so that it's largest absolute value uses the whole range of the type. Detection functions in ``artifactDetection`` and
+peak frequencies in ``processing_func`` do not depend on the scale of a channel, so scaled data can be used directly;
+the only exception are EEP blocks whose minimum or maximum is exactly zero.
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data.
+    dtype : data-type
+        Integer data type, e.g. int16.
+Returns:
+    scaledData : ndarray
+        Scaled EEG examination data.
+    scale : ndarray
+        Value of one unit of scaled data in each channel; ``scaledData * scale`` restores the data.
+"""
+
+
+def quantizeData(inputData, dtype=np.int16):
+    maxValue = np.iinfo(dtype).max
+    scale = (np.abs(inputData).max(axis=0, initial=0) / maxValue).astype(np.float32)
+    scale[scale == 0] = 1
+    scaledData = np.empty(inputData.shape, dtype=dtype)
+    np.rint(inputData / scale, out=scaledData, casting="unsafe")
+    return scaledData, scale
 
 
 # **********************************************************************************************************************
 
 
 """
-Reads data from ASC file, whose path is given by ``path``.
+Creates paths to cache files of file given by ``path``: NPY file storing EEG examination data and JSON file storing the
+rest of values read from the file together with the key of the cache.
+Parameters:
+    path : string
+        Path to the file which data are cached.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+    dtype : data-type
+        Data type of cached EEG examination data; each data type has it's own cache files.
+Returns:
+    dataPath : string
+        Path to the NPY file.
+    metadataPath : string
+        Path to the JSON file.
+"""
+
+
+def getCachePaths(path, cacheDir=None, dtype=float):
+    if cacheDir is None:
+        cacheDir = os.path.dirname(os.path.abspath(path))
+    cacheName = os.path.join(cacheDir, os.path.basename(path))
+    if np.dtype(dtype) != np.float64:
+        cacheName += "." + np.dtype(dtype).name
+    return cacheName + ".npy", cacheName + ".json"
+
+
+"""
+Creates the key of the cache of file given by ``path``. The cache is valid as long as the key does not change.
+Parameters:
+    path : string
+        Path to the file which data are cached.
+Returns:
+    key : dict
+        Absolute path, size and modification time of the file.
+"""
+
+
+def getCacheKey(path):
+    status = os.stat(path)
+    return {"source": os.path.abspath(path), "size": status.st_size, "mtime": status.st_mtime_ns}
+
+
+"""
+Reads values stored in the JSON cache file of file given by ``path``, without touching EEG examination data.
+Parameters:
+    path : string
+        Path to the file which data are cached.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+    dtype : data-type
+        Data type of cached EEG examination data.
+Returns:
+    metadata : dict
+        Values stored in the JSON cache file or None if there is no valid cache of the file.
+"""
+
+
+def loadCacheMetadata(path, cacheDir=None, dtype=float):
+    metadataPath = getCachePaths(path, cacheDir, dtype)[1]
+    try:
+        with open(metadataPath, "r") as file:
+            metadata = json.load(file)
+        if metadata["key"] != getCacheKey(path):
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return metadata
+
+
+"""
+Reads data of file given by ``path`` from it's cache. EEG examination data are memory-mapped, not read.
+Parameters:
+    path : string
+        Path to the file which data are cached.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+    dtype : data-type
+        Data type of cached EEG examination data.
+Returns:
+    tup : tuple
+        Tuple of values returned by ``extractData`` or None if there is no valid cache of the file.
+"""
+
+
+def loadCache(path, cacheDir=None, dtype=float):
+    metadata = loadCacheMetadata(path, cacheDir, dtype)
+    if metadata is None:
+        return None
+    try:
+        inputData = np.load(getCachePaths(path, cacheDir, dtype)[0], mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    return inputData, metadata["examinationTime"], metadata["samplingRate"], metadata["channelsNames"], \
+        metadata["eegChannelNumber"], metadata["ecgChannelNumber"]
+
+
+"""
+Stores data given by ``tup``, read from file given by ``path``, in it's cache. The JSON file is written last, so an
+interrupted write never leaves a cache which looks valid.
+Parameters:
+    path : string
+        Path to the file which data are cached.
+    tup : tuple
+        Tuple of values returned by ``extractData``.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+    scale : ndarray
+        Scale of integer EEG examination data, None for floating point data.
+Returns:
+    None
+"""
+
+
+def saveCache(path, tup, cacheDir=None, scale=None):
+    inputData, examinationTime, samplingRate, channelsNames, eegChannelNumber, ecgChannelNumber = tup
+    dataPath, metadataPath = getCachePaths(path, cacheDir, inputData.dtype)
+    metadata = {"key": getCacheKey(path), "examinationTime": examinationTime, "samplingRate": samplingRate,
+                "channelsNames": channelsNames, "eegChannelNumber": eegChannelNumber,
+                "ecgChannelNumber": ecgChannelNumber, "scale": None if scale is None else scale.tolist()}
+
+    if os.path.exists(metadataPath):
+        os.remove(metadataPath)
+    with open(dataPath + ".tmp", "wb") as file:
+        np.save(file, inputData)
+    os.replace(dataPath + ".tmp", dataPath)
+    with open(metadataPath + ".tmp", "w") as file:
+        json.dump(metadata, file)
+    os.replace(metadataPath + ".tmp", metadataPath)
+
+
+# **********************************************************************************************************************
+
+
+"""
+Reads data from ASC file, whose path is given by ``path``. The file is opened once: header is parsed first and then the
+numeric data are read straight into an array of requested data type.
 Parameters:
     path : string
         Path to the file which has to be read.
+    dtype : data-type
+        Data type of returned EEG examination data, e.g. float32 to halve the memory used.
 Returns:
      inputData : ndarray
         Whole EEG examination data.
@@ -84,17 +326,42 @@ Returns:
 """
 
 
-def extractDataAsc(path):
-    inputData = np.loadtxt(path, dtype=float, skiprows=11)
+def extractDataAsc(path, dtype=float):
+    with open(path, "r") as file:
+        header = [file.readline() for i in range(ascInformLines)]
+        examinationTime, samplingRate, channelsNames, eegChannelNumber, ecgChannelNumber = parseHeaderAsc(header)
+        # numeric data are read by numpy's C reader, in chunks, straight from the already opened file
+        inputData = np.loadtxt(file, dtype=dtype, ndmin=2)
+    return inputData, int(examinationTime), int(samplingRate), channelsNames, eegChannelNumber, ecgChannelNumber
+
+
+"""
+Parses header lines of ASC file given by ``lines``.
+Parameters:
+    lines : list
+        First ``ascInformLines`` lines of ASC file.
+Returns:
+     examinationTime : int
+        Duration of the EEG examination.
+     samplingRate : int
+        Sampling rate used in EEG examination.
+     channelsNames : list
+        Names of channels used in EEG examination.
+     eegChannelNumber : int
+        Number of EEG channels used in EEG examination.
+     ecgChannelNumber : int
+        Number of ECG channels used in EEG examination.
+"""
+
+
+def parseHeaderAsc(lines):
     examinationTime = ""
     samplingRate = ""
     channelsNames = []
     eegChannelNumber = 0
     ecgChannelNumber = 0
 
-    file = open(path, "r")
-    for i in range(11):
-        line = file.readline()
+    for line in lines:
         if "seconds" in line.lower():
             for char in line:
                 if char.isdigit():
@@ -119,8 +386,7 @@ def extractDataAsc(path):
                     item = result[i]
                     channelsNames.remove(item)
                     eegChannelNumber -= 1
-    file.close()
-    return inputData, int(examinationTime), int(samplingRate), channelsNames, eegChannelNumber, ecgChannelNumber
+    return int(examinationTime), int(samplingRate), channelsNames, eegChannelNumber, ecgChannelNumber
 
 
 # **********************************************************************************************************************
@@ -147,33 +413,44 @@ Returns:
 """
 
 
-def extractDataTxt(path):
-    samplingRate = ""
-
-    # following variables are hardcoded because TXT file structure is weird and there is no possibility to simply
-    # read these values; values written below are received from people working with new EEG devices generating such
-    # output files
-    channelsNames = ["C3", "C4", "Cz", "F3", "F4", "F7", "F8", "Fz", "Fp1", "Fp2", "O1",
-                         "O2", "Oz", "P3", "P4", "T5", "T6", "Pz", "T3", "T4"]
-    eegChannelNumber = 20
+def extractDataTxt(path, dtype=float):
+    channelsNames = list(txtChannelsNames)
+    eegChannelNumber = len(txtChannelsNames)
     ecgChannelNumber = 0
 
-    # checking number of lines in file
-    lineNumber = 0
-    informLines = 15
-    breakLines = 0
-    with open(path, "r", encoding="utf=16") as file:
-        for line in file:
-            lineNumber += 1
-            if "--- BREAK IN DATA ---" in line:
-                breakLines += 1
-    file.close()
-
-    # reading sampling rate value from file
-    dataLines = lineNumber - informLines - breakLines
-    inputData = np.zeros(shape=(dataLines, eegChannelNumber))
-    file = open(path, "r", encoding="utf-16")
-    for i in range(informLines):
+    with open(path, "r", encoding="utf-16") as file:
+        # reading sampling rate value from file
+        samplingRate = readSamplingRateTxt(file)
+
+        # reading EEG values from file into a growable array, chunk by chunk
+        inputData = np.empty(shape=(txtChunkLines, eegChannelNumber), dtype=dtype)
+        rowCount = 0
+        for chunk in iterateChunksTxt(file, dtype=dtype):
+            rowCount = appendRows(inputData, rowCount, chunk)
+        inputData.resize((rowCount, eegChannelNumber), refcheck=False)
+
+    examinationTime = int(len(inputData) / samplingRate)
+    return inputData, int(examinationTime), int(samplingRate), channelsNames, eegChannelNumber, ecgChannelNumber
+
+
+# **********************************************************************************************************************
+
+
+"""
+Reads sampling rate from information lines of TXT file given by ``file``. After the call ``file`` is positioned at the
+first data line.
+Parameters:
+    file : file object
+        TXT file opened for reading and positioned at it's beginning.
+Returns:
+    samplingRate : int
+        Sampling rate used in EEG examination.
+"""
+
+
+def readSamplingRateTxt(file):
+    samplingRate = ""
+    for i in range(txtInformLines):
         line = file.readline()
         if "sampling rate" in line.lower():
             for char in line:
@@ -181,44 +458,647 @@ def extractDataTxt(path):
                     samplingRate += char
                 elif char == ".":
                     break
+    return int(samplingRate)
+
+
+"""
+Reads data lines of TXT file given by ``file`` chunk by chunk and parses each chunk into an array. Lines informing
+about a break in data are skipped. A truncated last line (remainder of a "SHORT" token) leaves a row of zeros, the
+same way the row preallocated for it has always been left.
+Parameters:
+    file : file object
+        TXT file positioned at the first data line.
+    chunkLines : int
+        Number of lines parsed at once.
+    dtype : data-type
+        Data type of yielded arrays.
+Yields:
+    chunk : ndarray
+        EEG values of consecutive data lines, one row per line.
+"""
+
+
+def iterateChunksTxt(file, chunkLines=txtChunkLines, dtype=float):
+    pendingLine = None
+    while True:
+        lines = list(itertools.islice(file, chunkLines))
+        endOfFile = len(lines) < chunkLines
+        if pendingLine is not None:
+            lines.insert(0, pendingLine)
+        if not lines:
+            return
+
+        # the last line read is kept back until it is known whether it is the last line of the file
+        pendingLine = lines.pop()
+        if lines:
+            yield parseLinesTxt(lines, dtype)
+        if endOfFile:
+            break
+
+    if isTruncatedLineTxt(pendingLine):
+        yield np.zeros(shape=(1, len(txtChannelsNames)), dtype=dtype)
+    else:
+        yield parseLinesTxt([pendingLine], dtype)
+
+
+"""
+Parses data lines of TXT file given by ``lines`` into an array. "SHORT" and "AMPSAT" tokens are handled in the text of
+the whole chunk at once and columns holding EEG values are selected by numpy's C reader; lines informing about a break
+in data are skipped. If the chunk does not have the expected layout, it's lines are parsed one by one.
+Parameters:
+    lines : list
+        Data lines of TXT file.
+    dtype : data-type
+        Data type of returned array.
+Returns:
+    chunk : ndarray
+        EEG values of given lines, one row per line.
+"""
+
+
+def parseLinesTxt(lines, dtype=float):
+    eegChannelNumber = len(txtChannelsNames)
+
+    # "SHORT" tokens are dropped and "AMPSAT" tokens are replaced with zeros
+    text = "".join(lines).replace("SHORT", "").replace("AMPSAT", "0")
+
+    # the last column is read only to reject lines which are too short, it's value is not used
+    lastColumn = txtLeadingColumns + eegChannelNumber + txtTrailingColumns - 1
+    usecols = list(range(txtLeadingColumns, txtLeadingColumns + eegChannelNumber)) + [lastColumn]
+    try:
+        chunk = np.loadtxt(text.splitlines(), dtype=dtype, comments=breakLine, ndmin=2, usecols=usecols,
+                           converters={lastColumn: lambda value: 0})
+        return chunk[:, :eegChannelNumber]
+    except ValueError:
+        rows = [parseLineTxt(line) for line in lines if line.strip() and breakLine not in line]
+        return np.array(rows, dtype=dtype).reshape(-1, eegChannelNumber)
+
+
+"""
+Parses single data line of TXT file given by ``line``. Used for lines which do not have the layout expected by
+``parseLinesTxt``.
+Parameters:
+    line : string
+        Data line of TXT file.
+Returns:
+    res : list
+        EEG values of given line.
+"""
+
 
-    # reading EEG values from file
-    breakCounter = 0
-    for row in range(dataLines + breakLines):
-        content = file.readline()
-        if row == (dataLines + breakLines - 1):
-            if content.startswith(("SHORT", "HORT", "ORT", "RT", "T")):
+def parseLineTxt(line):
+    res = line.split()[txtLeadingColumns:-txtTrailingColumns]
+    res = [0 if value == "AMPSAT" else value for value in res if value != "SHORT"]
+    if len(res) != len(txtChannelsNames):
+        print("Length varies!")
+    return res[:len(txtChannelsNames)]
+
+
+"""
+Checks if the last line of TXT file, given by ``line``, is a truncated remainder of a "SHORT" token.
+Parameters:
+    line : string
+        Last line of TXT file.
+Returns:
+    truncated : bool
+        Boolean value informing if the line is truncated.
+"""
+
+
+def isTruncatedLineTxt(line):
+    return line.startswith(("SHORT", "HORT", "ORT", "RT", "T"))
+
+
+"""
+Copies rows given by ``rows`` into ``buffer`` after it's first ``rowCount`` rows, growing ``buffer`` in place when
+it is too short.
+Parameters:
+    buffer : ndarray
+        Array owning it's data, filled with ``rowCount`` rows.
+    rowCount : int
+        Number of rows already stored in ``buffer``.
+    rows : ndarray
+        Rows which have to be appended.
+Returns:
+    rowCount : int
+        Number of rows stored in ``buffer`` after appending.
+"""
+
+
+def appendRows(buffer, rowCount, rows):
+    newRowCount = rowCount + len(rows)
+    if newRowCount > len(buffer):
+        buffer.resize((max(newRowCount, 2 * len(buffer)), buffer.shape[1]), refcheck=False)
+    buffer[rowCount:newRowCount] = rows
+    return newRowCount
+
+
+# **********************************************************************************************************************
+
+
+"""
+Counts data lines of TXT file given by ``path`` without parsing them, reading the file in large pieces. Lines informing
+about a break in data are not counted.
+Parameters:
+    path : string
+        Path to the TXT file.
+Returns:
+    dataLines : int
+        Number of data lines in the file.
+"""
+
+
+def countDataLinesTxt(path):
+    lineNumber = 0
+    breakLines = 0
+    tail = ""
+    lastChar = "\n"
+    with open(path, "r", encoding="utf-16") as file:
+        while True:
+            text = file.read(1 << 20)
+            if not text:
                 break
+            lineNumber += text.count("\n")
+            # the end of previous piece is searched too, so that a break line cut in two is counted once
+            breakLines += (tail + text).count(breakLine)
+            tail = text[-(len(breakLine) - 1):]
+            lastChar = text[-1]
+    if lastChar != "\n":
+        lineNumber += 1
+    return lineNumber - txtInformLines - breakLines
+
 
-        if "--- BREAK IN DATA ---" in content:
-            breakCounter += 1
-            continue
+"""
+EEG examination stored in ASC or TXT file given by ``path``. Creating the object reads the header of the file only,
+the same part which ``checkFile`` probes; EEG examination data are read when they are used for the first time, e.g. by
+a detection function or ``processing_func/get_tag_epochs``. Rows of the data are samples and columns are channels, the
+same as in ``inputData`` returned by ``extractData``, and the object can be indexed the same way.
+Parameters:
+    path : string
+        Path to the file which has to be read.
+    useCache : bool
+        Boolean value informing if the binary cache of ``extractData`` has to be used.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+    dtype : data-type
+        Data type of EEG examination data: float64, float32 or int16.
+Attributes:
+    path : string
+        Path to the file.
+    fileFormat : string
+        Format of the file, "asc" or "txt".
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    channelsNames : list
+        Names of channels used in EEG examination.
+    eegChannelNumber : int
+        Number of EEG channels used in EEG examination.
+    ecgChannelNumber : int
+        Number of ECG channels used in EEG examination.
+    examinationTime : int
+        Duration of the EEG examination; for TXT files data lines are counted when it is used for the first time.
+    inputData : ndarray
+        Whole EEG examination data, read when it is used for the first time.
+    scale : ndarray
+        Scale of integer EEG examination data (see ``quantizeData``), None for floating point data.
+"""
+
+
+class Recording:
+    __slots__ = ("path", "fileFormat", "samplingRate", "channelsNames", "eegChannelNumber", "ecgChannelNumber",
+                 "useCache", "cacheDir", "dtype", "_examinationTime", "_inputData", "_scale")
+
+    def __init__(self, path, useCache=False, cacheDir=None, dtype=float):
+        if not checkFile(path):
+            raise ValueError("File does not contain EEG examination data: " + path)
+        self.path = path
+        self.useCache = useCache
+        self.cacheDir = cacheDir
+        self.dtype = np.dtype(dtype)
+        self._examinationTime = None
+        self._inputData = None
+        self._scale = None
+
+        if path.endswith("asc"):
+            self.fileFormat = "asc"
+            with open(path, "r") as file:
+                header = [file.readline() for i in range(ascInformLines)]
+            self._examinationTime, self.samplingRate, self.channelsNames, self.eegChannelNumber, \
+                self.ecgChannelNumber = parseHeaderAsc(header)
         else:
-            res = content.split()
-            # print(row)
-            for index in range(4):
-                res.pop(0)
+            self.fileFormat = "txt"
+            with open(path, "r", encoding="utf-16") as file:
+                self.samplingRate = readSamplingRateTxt(file)
+            self.channelsNames = list(txtChannelsNames)
+            self.eegChannelNumber = len(txtChannelsNames)
+            self.ecgChannelNumber = 0
 
-            for index in range(42):
-                res.pop()
+    @property
+    def examinationTime(self):
+        if self._examinationTime is None:
+            metadata = loadCacheMetadata(self.path, self.cacheDir, self.dtype) if self.useCache else None
+            if metadata is not None:
+                self._examinationTime = metadata["examinationTime"]
+            elif self._inputData is not None:
+                self._examinationTime = int(len(self._inputData) / self.samplingRate)
+            else:
+                self._examinationTime = int(countDataLinesTxt(self.path) / self.samplingRate)
+        return self._examinationTime
 
-            shortCounter = res.count("SHORT")
-            for index in range(shortCounter):
-                res.remove("SHORT")
+    @property
+    def inputData(self):
+        if self._inputData is None:
+            tup, self._scale = extractScaledData(self.path, self.useCache, self.cacheDir, self.dtype)
+            self._inputData = tup[0]
+        return self._inputData
 
-            if "AMPSAT" in res:
-                for index in range(20):
-                    if res[index] == "AMPSAT":
-                        res[index] = 0
+    @property
+    def scale(self):
+        if np.issubdtype(self.dtype, np.integer):
+            self.inputData
+        return self._scale
 
-            if len(res) != 20:
-                print("Length varies!")
+    @property
+    def shape(self):
+        return self.inputData.shape
 
-            inputData[row - breakCounter] = [res[0], res[1], res[2], res[3], res[4], res[5], res[6], res[7], res[8], res[9],
-                                 res[10],
-                              res[11],
-                              res[12], res[13], res[14], res[15], res[16], res[17], res[18], res[19]]
+    def __getitem__(self, key):
+        return self.inputData[key]
 
-    file.close()
-    examinationTime = int(len(inputData) / int(samplingRate))
-    return inputData, int(examinationTime), int(samplingRate), channelsNames, eegChannelNumber, ecgChannelNumber
+    def __len__(self):
+        return len(self.inputData)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.inputData, dtype=dtype)
+
+    """
+    Returns values of one channel, given by ``channelNumber``, counted the same way as columns of ``inputData``. Until
+    the whole data are read, only the requested column is read: from the memory-mapped cache when it exists, otherwise
+    from the file (see ``readChannel``).
+    """
+
+    def getChannel(self, channelNumber):
+        if self._inputData is None:
+            cached = loadCache(self.path, self.cacheDir, self.dtype) if self.useCache else None
+            if cached is not None:
+                return cached[0][:, channelNumber]
+            return readChannel(self.path, channelNumber, self.dtype)
+        return self.inputData[:, channelNumber]
+
+    """
+    Returns values of all channels between samples ``startSample`` (inclusive) and ``stopSample`` (exclusive). Until
+    the whole data are read, only requested samples are read from the file (see ``readRange``).
+    """
+
+    def getSamples(self, startSample, stopSample):
+        # samples of a recording which is not read yet are read from the file through it's sample index
+        if self._inputData is None and np.issubdtype(self.dtype, np.floating):
+            if not (self.useCache and loadCacheMetadata(self.path, self.cacheDir, self.dtype) is not None):
+                return readRange(self.path, startSample, stopSample, self.dtype, self.cacheDir)
+        return self.inputData[startSample:stopSample]
+
+    """
+    Returns values read from the file in the same tuple as ``extractData`` does.
+    """
+
+    def toTuple(self):
+        return self.inputData, self.examinationTime, self.samplingRate, self.channelsNames, self.eegChannelNumber, \
+            self.ecgChannelNumber
+
+
+# **********************************************************************************************************************
+
+
+"""
+Reads data lines of ASC file given by ``file`` chunk by chunk and parses each chunk into an array.
+Parameters:
+    file : file object
+        ASC file positioned at the first data line.
+    chunkLines : int
+        Number of lines parsed at once.
+    dtype : data-type
+        Data type of yielded arrays.
+Yields:
+    chunk : ndarray
+        Values of consecutive data lines, one row per line.
+"""
+
+
+def iterateChunksAsc(file, chunkLines=ascChunkLines, dtype=float):
+    while True:
+        lines = list(itertools.islice(file, chunkLines))
+        if not lines:
+            return
+        yield np.loadtxt(lines, dtype=dtype, ndmin=2)
+
+
+"""
+Reads EEG examination data from file, whose path is given by ``path``, block by block, so that a recording of any length
+can be processed with a fixed amount of memory. Only complete blocks are yielded. Detection functions in
+``artifactDetection`` accept the returned generator in place of ``inputData``.
+Parameters:
+    path : string
+        Path to the file which has to be read.
+    blockDuration : int
+        Duration of one block in seconds.
+    useCache : bool
+        Boolean value informing if the binary cache of ``extractData`` has to be used when it exists.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+    dtype : data-type
+        Data type of yielded values: float64 or float32. Integer data (e.g. int16) are scaled by the range of every
+        channel, known only when the whole file is read, so they are yielded only from a valid cache of that type, as
+        stored in it (see ``quantizeData``; the scale is returned by ``extractScaledData``); without such cache
+        ValueError is raised before the file is read.
+Yields:
+    blockIndex : int
+        Number of the block, counted from 0.
+    samples : ndarray
+        Values of all channels in the block; rows are channels, the same as columns of ``inputData``.
+"""
+
+
+def iterateBlocks(path, blockDuration=4, useCache=False, cacheDir=None, dtype=float):
+    recording = Recording(path, useCache, cacheDir, dtype)
+    blockLength = blockDuration * recording.samplingRate
+
+    # memory-mapped cache is read block by block directly
+    cached = loadCache(path, cacheDir, dtype) if useCache else None
+    if cached is None and np.issubdtype(dtype, np.integer):
+        raise ValueError("Integer data can be read block by block only from the cache, read " + path +
+                         " with extractData(useCache=True) first or use a floating point data type")
+    if cached is not None:
+        inputData = cached[0]
+        for blockIndex in range(len(inputData) // blockLength):
+            startPosition = blockIndex * blockLength
+            yield blockIndex, np.ascontiguousarray(inputData[startPosition:startPosition + blockLength].T)
+        return
+
+    if recording.fileFormat == "asc":
+        file = open(path, "r")
+        for i in range(ascInformLines):
+            file.readline()
+        chunks = iterateChunksAsc(file, dtype=dtype)
+    else:
+        file = open(path, "r", encoding="utf-16")
+        readSamplingRateTxt(file)
+        chunks = iterateChunksTxt(file, dtype=dtype)
+
+    # rows which do not fill a whole block are kept and completed with the next chunk
+    with file:
+        blockIndex = 0
+        pending = None
+        for chunk in chunks:
+            if pending is not None:
+                chunk = np.concatenate((pending, chunk))
+            blockNumber = len(chunk) // blockLength
+            for block in range(blockNumber):
+                startPosition = block * blockLength
+                yield blockIndex, np.ascontiguousarray(chunk[startPosition:startPosition + blockLength].T)
+                blockIndex += 1
+            pending = chunk[blockNumber * blockLength:]
+
+
+# **********************************************************************************************************************
+
+
+"""
+Creates path to the sample index file of file given by ``path`` (see ``buildSampleIndex``).
+Parameters:
+    path : string
+        Path to the indexed file.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+Returns:
+    indexPath : string
+        Path to the NPZ file storing the index.
+"""
+
+
+def getSampleIndexPath(path, cacheDir=None):
+    if cacheDir is None:
+        cacheDir = os.path.dirname(os.path.abspath(path))
+    return os.path.join(cacheDir, os.path.basename(path)) + ".index.npz"
+
+
+"""
+Builds index of file given by ``path`` which maps sample numbers to byte offsets of data lines in the file. The file is
+scanned in large pieces without parsing it; lines informing about a break in data are not counted as samples. To keep
+the index small only the offset of every ``indexStride``-th sample is stored.
+Parameters:
+    path : string
+        Path to the ASC or TXT file.
+    stride : int
+        Number of samples between stored offsets.
+Returns:
+    offsets : ndarray
+        Byte offsets of samples 0, ``stride``, 2 * ``stride``, ...
+    metadata : dict
+        Key of the index (see ``getCacheKey``), stride, number of samples, format and encoding of the file.
+"""
+
+
+def buildSampleIndex(path, stride=indexStride):
+    if path.endswith("asc"):
+        fileFormat = "asc"
+        informLines = ascInformLines
+        encoding = None
+        codeType = np.uint8
+        firstLineStart = 0
+    else:
+        fileFormat = "txt"
+        informLines = txtInformLines
+        with open(path, "rb") as file:
+            byteOrderMark = file.read(2)
+        encoding = "utf-16-be" if byteOrderMark == b"\xfe\xff" else "utf-16-le"
+        codeType = np.dtype(">u2") if encoding == "utf-16-be" else np.dtype("<u2")
+        firstLineStart = 2 if byteOrderMark in (b"\xff\xfe", b"\xfe\xff") else 0
+    codeSize = np.dtype(codeType).itemsize
+    newline = "\n".encode(encoding or "ascii")
+    breakBytes = breakLine.encode(encoding or "ascii")
+
+    offsets = []
+    lineNumber = 0
+    sampleNumber = 0
+    with open(path, "rb") as file:
+        file.seek(firstLineStart)
+        chunkStart = firstLineStart
+        remainder = b""
+        while True:
+            data = file.read(1 << 22)
+            endOfFile = len(data) == 0
+            data = remainder + data
+            if not data:
+                break
+
+            # only complete lines are indexed, a cut line is left for the next piece
+            if endOfFile:
+                chunkEnd = len(data)
+            else:
+                chunkEnd = data.rfind(newline) + len(newline)
+                while chunkEnd > 0 and chunkEnd % codeSize != 0:
+                    chunkEnd = data.rfind(newline, 0, chunkEnd - len(newline)) + len(newline)
+                if chunkEnd <= 0:
+                    remainder = data
+                    continue
+            remainder = data[chunkEnd:]
+            codes = np.frombuffer(data[:chunkEnd - chunkEnd % codeSize], dtype=codeType)
+
+            # starts of lines, relative to the beginning of the piece
+            lineStarts = np.concatenate(([0], (np.flatnonzero(codes == 10) + 1) * codeSize))
+            lineStarts = lineStarts[lineStarts < chunkEnd]
+
+            # skipping information lines and lines informing about a break in data
+            isSample = np.ones(len(lineStarts), dtype=bool)
+            isSample[:max(informLines - lineNumber, 0)] = False
+            position = data.find(breakBytes, 0, chunkEnd)
+            while position != -1:
+                if position % codeSize == 0:
+                    isSample[np.searchsorted(lineStarts, position, side="right") - 1] = False
+                position = data.find(breakBytes, position + 1, chunkEnd)
+            sampleStarts = lineStarts[isSample]
+
+            # storing offsets of every stride-th sample
+            sampleNumbers = sampleNumber + np.arange(len(sampleStarts))
+            offsets.append(chunkStart + sampleStarts[sampleNumbers % stride == 0])
+
+            lineNumber += len(lineStarts)
+            sampleNumber += len(sampleStarts)
+            chunkStart += chunkEnd
+            if endOfFile:
+                break
+
+    metadata = {"key": getCacheKey(path), "stride": stride, "sampleNumber": sampleNumber, "fileFormat": fileFormat,
+                "encoding": encoding}
+    return np.concatenate(offsets).astype(np.int64) if offsets else np.zeros(0, dtype=np.int64), metadata
+
+
+"""
+Reads sample index of file given by ``path``, building and storing it when there is no valid one.
+Parameters:
+    path : string
+        Path to the indexed file.
+    cacheDir : string
+        Path to the directory storing cache files; by default they are stored next to the file.
+Returns:
+    offsets : ndarray
+        Byte offsets of every ``stride``-th sample.
+    metadata : dict
+        Values describing the index (see ``buildSampleIndex``).
+"""
+
+
+def loadSampleIndex(path, cacheDir=None):
+    indexPath = getSampleIndexPath(path, cacheDir)
+    try:
+        with np.load(indexPath) as stored:
+            metadata = json.loads(str(stored["metadata"]))
+            if metadata["key"] == getCacheKey(path):
+                return stored["offsets"], metadata
+    except (OSError, ValueError, KeyError):
+        pass
+
+    offsets, metadata = buildSampleIndex(path)
+    try:
+        with open(indexPath + ".tmp", "wb") as file:
+            np.savez(file, offsets=offsets, metadata=np.array(json.dumps(metadata)))
+        os.replace(indexPath + ".tmp", indexPath)
+    except OSError:
+        # the index is still used when it cannot be stored, e.g. in a read-only directory
+        pass
+    return offsets, metadata
+
+
+"""
+Reads samples from ``startSample`` (inclusive) to ``stopSample`` (exclusive) of file given by ``path``. The sample index
+of the file is used to seek close to ``startSample``, so only the requested samples (and at most ``indexStride`` lines
+before them) are read and parsed.
+Parameters:
+    path : string
+        Path to the ASC or TXT file.
+    startSample : int
+        Number of the first sample.
+    stopSample : int
+        Number of the sample following the last one.
+    dtype : data-type
+        Floating point data type of returned values.
+    cacheDir : string
+        Path to the directory storing the sample index; by default it is stored next to the file.
+Returns:
+    samples : ndarray
+        Values of all channels, one row per sample, the same as rows of ``inputData`` returned by ``extractData``.
+"""
+
+
+def readRange(path, startSample, stopSample, dtype=float, cacheDir=None):
+    offsets, metadata = loadSampleIndex(path, cacheDir)
+    stride = metadata["stride"]
+    startSample, stopSample, step = slice(startSample, stopSample).indices(metadata["sampleNumber"])
+    columnNumber = None if metadata["fileFormat"] == "asc" else len(txtChannelsNames)
+    if stopSample <= startSample:
+        return np.zeros(shape=(0, columnNumber or 0), dtype=dtype)
+
+    # reading data lines from the closest indexed sample, skipping lines informing about a break in data
+    lines = []
+    with open(path, "rb") as binaryFile:
+        binaryFile.seek(int(offsets[startSample // stride]))
+        with io.TextIOWrapper(binaryFile, encoding=metadata["encoding"]) as file:
+            skipLines = startSample % stride
+            for line in file:
+                if breakLine in line:
+                    continue
+                if skipLines > 0:
+                    skipLines -= 1
+                    continue
+                lines.append(line)
+                if len(lines) == stopSample - startSample:
+                    break
+
+    if metadata["fileFormat"] == "asc":
+        return np.loadtxt(lines, dtype=dtype, ndmin=2)
+
+    # a truncated last line of TXT file leaves a row of zeros, the same as in ``extractDataTxt``
+    if stopSample == metadata["sampleNumber"] and isTruncatedLineTxt(lines[-1]):
+        samples = np.zeros(shape=(len(lines), columnNumber), dtype=dtype)
+        samples[:-1] = parseLinesTxt(lines[:-1], dtype)
+        return samples
+    return parseLinesTxt(lines, dtype)
+
+
+"""
+Reads values of one channel, given by ``channelNumber``, of file given by ``path``. The file is read chunk by chunk and
+only the requested column is kept; in ASC files only it's values are converted. Integer data are read as float32 and
+scaled the same way as the channel of whole data (see ``quantizeData``).
+Parameters:
+    path : string
+        Path to the ASC or TXT file.
+    channelNumber : int
+        Number of the channel, counted the same way as columns of ``inputData`` returned by ``extractData``.
+    dtype : data-type
+        Data type of returned values: float64, float32 or int16.
+Returns:
+    channel : ndarray
+        Values of the channel, one per sample.
+"""
+
+
+def readChannel(path, channelNumber, dtype=float):
+    readDtype = np.float32 if np.issubdtype(dtype, np.integer) else dtype
+    if path.endswith("asc"):
+        with open(path, "r") as file:
+            for i in range(ascInformLines):
+                file.readline()
+            channel = np.loadtxt(file, dtype=readDtype, usecols=channelNumber, ndmin=1)
+    else:
+        with open(path, "r", encoding="utf-16") as file:
+            readSamplingRateTxt(file)
+            channel = np.empty(shape=(txtChunkLines, 1), dtype=readDtype)
+            rowCount = 0
+            for chunk in iterateChunksTxt(file, dtype=readDtype):
+                rowCount = appendRows(channel, rowCount, chunk[:, [channelNumber]])
+            channel.resize((rowCount, 1), refcheck=False)
+            channel = channel[:, 0]
+
+    if np.issubdtype(dtype, np.integer):
+        channel = quantizeData(channel[:, np.newaxis], dtype)[0][:, 0]
+    return channel
@@ -6,17 +6,18 @@ Creates file containing start and end positions, expressed by samples, of blocks
 Parameters:
     array : ndarray
         Array containing start and end positions, expressed by samples, of blocks containing artifacts.
+    filePath : string
+        Path to the created file.
 Returns:
     None
 """
 
 
-def createFile(array):
-    filePath = "result.txt"
+def createFile(array, filePath="result.txt"):
     if os.path.exists(filePath):
         print("File already exists")
     else:
-        with open("result.txt", "w") as file:
+        with open(filePath, "w") as file:
             file.write("Start\t")
             file.write("End\n")
             for row in array:
@@ -32,13 +33,17 @@ Parameters:
         List of boolean values informing about artifact occurrence in each block.
     samplingRate : int
         Sampling rate used in EEG examination.
+    blockDuration : float
+        Duration of a block in seconds, the same as used by the detection function.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds; by default equal to ``blockDuration``.
 Returns:
     array : ndarray
         Array containing start and end positions, expressed by samples, of blocks containing artifacts.
 """
 
 
-def markArtifacts(isArtifactList, samplingRate):
+def markArtifacts(isArtifactList, samplingRate, blockDuration=4, hopDuration=None):
     # counting blocks containing artifacts
     arrayLength = isArtifactList.count(True)
 
@@ -50,12 +55,14 @@ def markArtifacts(isArtifactList, samplingRate):
 
     # initializing necessary variables
     arrayInd = 0
-    blockDuration = 4  # for now, block length is 4 s
-    step = blockDuration * samplingRate
+    if hopDuration is None:
+        hopDuration = blockDuration
+    step = int(round(blockDuration * samplingRate))
+    hop = int(round(hopDuration * samplingRate))
 
     # calculating start and end position, expressed by samples, of a block containing artifact
     for ind in indexes:
-        startPosition = ind * step
+        startPosition = ind * hop
         endPosition = startPosition + step
         array[arrayInd, 0] = startPosition
         array[arrayInd, 1] = endPosition
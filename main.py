@@ -1,23 +1,19 @@
 ## import
 import numpy as np
 import os
-import re
-import json
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 ## local import
-import dataExtraction
+import batch_processing
 import processing_func
-import artifactDetection
-import fileCreating
+import recordingCatalog
+import thresholdCalculation
 
 ## PATHS
 dataPath = 'D:\\TeleBrain\\Data\\PD_test_data\\'
 #dataPath = 'D:\\TeleBrain\\Data\\PD_512Hz from 1_06_2020 to 31_03_2021\\'
 #dataPath = 'D:\\TeleBrain\\Data\\temp\\'
 descPath = 'D:\\TeleBrain\\Data\\Notes in Polish\\'
-jsonPath = 'D:\\TeleBrain\\Data\\patient_frames\\'
+framesPath = 'D:\\TeleBrain\\Data\\patient_frames\\'  # frame store: <name>_frames.npy and <name>_frames.json
 resultsPath = 'D:\\TeleBrain\\results\\frame_results\\'
 resultsWavePath = 'D:\\TeleBrain\\results\\frame_results_wave\\'
 
@@ -36,101 +32,82 @@ brain_waves = {
 }
 
 ## PROCESSING PARAMETERS
+# artifact detectors, any of artifactDetection.detectorRegistry: 'EEP', 'LFP', 'ECG'
+detectors = ['EEP']
+# detection blocks, in seconds; a hop shorter than the block makes blocks overlap
+block_duration = 4
+hop_duration = 4
+# thresholds fitted once over all recordings and stored in this file (fitted when it does not exist yet),
+# None uses thresholds of every recording
+threshold_model_path = None  # e.g. resultsPath + 'threshold_model.json'
 # frame parameters
 tag_name = 'Oczy zamknięte'
 epoch_size = 8  # in seconds
 overlap = int(epoch_size/2)  # in seconds
 # filter parameters
 butter_degree = 4  # TO_OPTIMIZE: find degree
-
-## LOAD FOLDER
-# load data list
-fileList = os.listdir(dataPath)
-# load description list
-descList = os.listdir(descPath)
-
-## INITIALIZE VARIABLES
-patients_data = dict()  # contain json with eeg frames
-
-## CREATE RESULT FOLDERS
-if not os.path.isdir(jsonPath):
-    os.makedirs(jsonPath, exist_ok=True)
+# sample storage parameters
+sample_dtype = np.float64  # np.float32 or np.int16 (scaled per channel) use 2-4x less memory
+
+## BATCH PARAMETERS
+n_workers = os.cpu_count()  # number of recordings processed in parallel, 1 processes them one by one
+# number of threads detecting artifacts in time chunks of one recording; more than 1 helps when a few long
+# recordings dominate the run, e.g. with n_workers = 1 and detection_workers = os.cpu_count()
+detection_workers = 1
+
+if __name__ == '__main__':
+
+    ## LOAD FOLDER
+    # load data list from the catalog of the folder, largest recordings first
+    catalog = recordingCatalog.buildCatalog(dataPath, workers=n_workers)
+    fileList = recordingCatalog.planFiles(catalog)
+    print('%d recordings found, %d other files skipped' % (len(fileList), len(catalog) - len(fileList)))
+    # load index of tags in description files, only new and changed files are read
+    tag_index = processing_func.build_tag_index(descPath)
+
+    ## CREATE RESULT FOLDERS
+    os.makedirs(framesPath, exist_ok=True)
     os.makedirs(resultsPath, exist_ok=True)
     os.makedirs(resultsWavePath, exist_ok=True)
 
-### FOR EACH FILE
-for file in fileList:
-    print(file)
-
-    ## EXTRACT SIGNAL
-    print('reading data')
-    data = dataExtraction.extractData(dataPath + file)
-
-    # --- Here starts added code ---
-    signals = data[0]
-    output = artifactDetection.performEEPDetection(signals, data[4], data[1], data[2])
-    # output = artifactDetection.performLFPDetection(signals, data[4], data[1], data[2], 0.625, data[2] / 2, 50)
-    isArtifactList = output[0]
-    array = fileCreating.markArtifacts(isArtifactList, data[2])
-    fileCreating.createFile(array)
-    # --- Here ends added code ---
-
-    signals = np.transpose(data[0])
-
-    ## EXTRACT SIGNAL PARAMETERS
-    sampling_rate = data[2]
-
-    ## GET DESCRIPTION DATA
-    name = file.split('.')[0]
-    descName = [x for x in descList if re.search(name, x)]
-
-    ## FIND TIME STAMPS FOR TAGS IN DESCRIPTION DATA
-    print('looking for tags in signal')
-    tag_time = processing_func.get_time_tags(descName[0], tag_name, descPath)
-
-    ## GET SIGNAL TO ANALYSIS
-    if tag_time:
-
-        ## GET FRAMES FROM SIGNAL
-        print('extracting frames')
-        patients_data = processing_func.get_tag_frames(name, signals, sampling_rate, epoch_size, overlap, tag_time)
-
-        # store data in json
-        print('saving frames into json')
-        json_name = os.path.join(jsonPath, name+".json")
-        out_file = open(json_name, "w")
-        json.dump(patients_data, out_file)
-        out_file.close()
-
-        # if not processed open JSON file
-        # print('loading frames from json')
-        # with open(jsonPath + name+".json") as json_file:
-        #     patients_data = json.load(json_file)
-
-        ## GET SPECTRAL DATA FROM FRAME
-        print('estimating peak frequency for brain waves')
-        peak_results = processing_func.get_peak_results(name, patients_data, epoch_size, sampling_rate, channelsNames, brain_waves, butter_degree)
-        # save results
-        peak_results.to_csv(resultsWavePath + name + '.csv', index=True)
-
-        ## PLOT SPECTRAL DATA
-        print('plotting results')
-        data_to_plot = peak_results[['channel', 'gamma', 'beta', 'alpha', 'theta', 'delta']]
-        g = sns.pairplot(data_to_plot, hue='channel')
-        g.savefig(resultsWavePath + name + "_hist.png")
-        plt.close()
-
-        ## basic statistics
-        # result_main = data_to_plot.groupby([str('channel')]).mean()
-        # print(result_main)
-        # result_std = data_to_plot.groupby([str('channel')]).std()
-        # print(result_std)
-
-    else:
-        print('no matching description file found')
-
-
-
-
-
-
+    ## SETTINGS PASSED TO WORKERS
+    settings = {
+        'dataPath': dataPath,
+        'descPath': descPath,
+        'tag_index': tag_index,
+        'framesPath': framesPath,
+        'resultsPath': resultsPath,
+        'resultsWavePath': resultsWavePath,
+        'channelsNames': channelsNames,
+        'brain_waves': brain_waves,
+        'tag_name': tag_name,
+        'epoch_size': epoch_size,
+        'overlap': overlap,
+        'butter_degree': butter_degree,
+        'sample_dtype': sample_dtype,
+        'detectors': detectors,
+        'block_duration': block_duration,
+        'hop_duration': hop_duration,
+        'detection_workers': detection_workers,
+        'threshold_model': None
+    }
+
+    ## FIT OR LOAD COHORT THRESHOLDS
+    if threshold_model_path is not None:
+        # integer samples round small values to zero, which EEP detection compares without logarithm, so a model
+        # fitted on them differs from one fitted on floating point samples
+        if np.issubdtype(sample_dtype, np.integer):
+            raise ValueError('threshold_model_path needs floating point sample_dtype, not ' + np.dtype(sample_dtype).name)
+        if os.path.exists(threshold_model_path):
+            settings['threshold_model'] = thresholdCalculation.loadThresholdModel(threshold_model_path)
+            # a model fitted on other blocks is fitted again
+            fitted = (settings['threshold_model'].get('blockDuration'), settings['threshold_model'].get('hopDuration'))
+            current = (block_duration, hop_duration if hop_duration is not None else block_duration)
+            if fitted != current:
+                print('threshold model was fitted on %s s blocks every %s s, fitting it again on %s s blocks every %s s' % (fitted + current))
+                settings['threshold_model'] = None
+        if settings['threshold_model'] is None:
+            settings['threshold_model'] = batch_processing.fit_threshold_model(fileList, settings, threshold_model_path, n_workers)
+
+    ### FOR EACH FILE, IN PARALLEL
+    batch_processing.run_batch(fileList, settings, n_workers)
@@ -1,9 +1,14 @@
 import numpy as np
 import pandas as pd
 import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy import signal
 import math
+import os
+import re
+import json
 from datetime import datetime
+import dataExtraction
 
 def abnormality_pred(modelPath, signals, sampling_rate, timepoints_to_skip, set_to_zero_threshold, window_length, n_windows):
 
@@ -40,43 +45,120 @@ def abnormality_pred(modelPath, signals, sampling_rate, timepoints_to_skip, set_
 
 def get_time_tags(fileName, tag_name, descPath):
     # def get time for description
+    return find_tag_times(read_desc_events(descPath + fileName), tag_name)
 
-    tag_time = {'begin': [], 'start': [], 'stop': []}
-    is_found = False
+
+def read_desc_events(descFile):
+    # read event lines of a description file, starting from the first line with recording data ('d1')
+    # returns {'begin': [time of the first line], 'events': [[time, line], ...]}
+
+    desc_events = {'begin': [], 'events': []}
     run_first = True
 
     # read file
-    f = open(descPath + fileName, "r", encoding="utf-16")
+    f = open(descFile, "r", encoding="utf-16")
     for line in f:
-        #print(line)
-        #print(is_found)
 
         # find the first line with recording data
         if run_first:
             if 'd1' in line:
                 temp = line.split(maxsplit=2)
-                tag_time['begin'].append(temp[1])
+                desc_events['begin'].append(temp[1])
                 run_first = False
             else:
                 continue
 
+        temp = line.split(maxsplit=2)
+        desc_events['events'].append([temp[1] if len(temp) > 1 else None, line])
+
+    f.close()
+    return desc_events
+
+
+def find_tag_times(desc_events, tag_name):
+    # find start and stop times of every event containing tag_name in events read by read_desc_events
+    # the stop of an event is the time of the following event
+
+    tag_time = {'begin': list(desc_events['begin']), 'start': [], 'stop': []}
+    is_found = False
+
+    for time, line in desc_events['events']:
+
         # find next event - stop
         if is_found:
-            temp = line.split(maxsplit=2)
-            tag_time['stop'].append(temp[1])
-            #tag_time.append(temp[1])
+            tag_time['stop'].append(time)
             is_found = False
 
         # find event description lines - start
         if tag_name in line:
-            temp = line.split(maxsplit=2)
-            tag_time['start'].append(temp[1])
-            #tag_time.append(temp[1])
+            tag_time['start'].append(time)
             is_found = True
 
-    f.close()
     return tag_time
 
+
+def build_tag_index(descPath, index_path=None):
+    # read events of every description file in descPath once and keep them in a JSON index (descPath/tag_index.json
+    # by default); only files whose size or modification time changed since the index was stored are read again
+    # returns {'files': {descName: {'size', 'mtime', 'begin', 'events'}}, 'recordings': {recording name: descName}}
+
+    if index_path is None:
+        index_path = os.path.join(descPath, 'tag_index.json')
+
+    # load stored index
+    try:
+        with open(index_path, 'r', encoding='utf-8') as json_file:
+            stored_files = json.load(json_file)
+    except (OSError, ValueError):
+        stored_files = {}
+
+    files = {}
+    for descName in sorted(os.listdir(descPath)):
+        descFile = os.path.join(descPath, descName)
+        if descName == os.path.basename(index_path) or not os.path.isfile(descFile):
+            continue
+        status = os.stat(descFile)
+        entry = stored_files.get(descName)
+        if entry is None or entry['size'] != status.st_size or entry['mtime'] != status.st_mtime_ns:
+            try:
+                entry = {'size': status.st_size, 'mtime': status.st_mtime_ns, **read_desc_events(descFile)}
+            except (UnicodeError, IndexError):
+                # not a description file
+                continue
+        files[descName] = entry
+
+    # store index if anything changed
+    if files != stored_files:
+        with open(index_path + '.tmp', 'w', encoding='utf-8') as json_file:
+            json.dump(files, json_file)
+        os.replace(index_path + '.tmp', index_path)
+
+    # recording name is the description file name without extension
+    recordings = {}
+    for descName in files:
+        recordings.setdefault(descName.split('.')[0], descName)
+
+    return {'files': files, 'recordings': recordings}
+
+
+def find_desc_name(tag_index, name):
+    # find description file of recording name in index built by build_tag_index, None when there is none
+    # a file named after the recording is a dictionary hit, other names are searched as before
+
+    descName = tag_index['recordings'].get(name)
+    if descName is None:
+        descName = next((x for x in tag_index['files'] if re.search(name, x)), None)
+    return descName
+
+
+def get_indexed_time_tags(tag_index, name, tag_name):
+    # get time of tag_name for recording name from index built by build_tag_index, None when there is no description
+
+    descName = find_desc_name(tag_index, name)
+    if descName is None:
+        return None
+    return find_tag_times(tag_index['files'][descName], tag_name)
+
 def signaltonoise(a, axis=0, ddof=0):
     a = np.asanyarray(a)
     m = a.mean(axis)
@@ -84,9 +166,41 @@ def signaltonoise(a, axis=0, ddof=0):
     return np.where(sd == 0, 0, abs(m/sd))
 
 
-def butter_filter(signals_raw, filter_degree, filter_freq):
-    sos = signal.butter(filter_degree, filter_freq, 'hp', fs=1000, output='sos')
-    filtered = signal.sosfilt(sos, signals_raw)
+class FilterBank:
+    # Butterworth filters in second-order sections, designed once per (degree, frequency, type, sampling rate,
+    # dtype) and applied along the time axis (the last one) of arrays of any shape, e.g. (channels, samples)
+    # or (frames, channels, samples)
+
+    __slots__ = ('sections',)
+
+    def __init__(self):
+        self.sections = {}
+
+    def get_sos(self, degree, freq, btype, sampling_rate, dtype=np.float64):
+        key = (degree, freq, btype, sampling_rate, np.dtype(dtype).str)
+        if key not in self.sections:
+            sos = signal.butter(degree, freq, btype, fs=sampling_rate, output='sos')
+            self.sections[key] = sos.astype(dtype)
+        return self.sections[key]
+
+    def filter(self, signals, degree, freq, btype, sampling_rate):
+        # signals are filtered in their own floating point precision
+        signals = np.asarray(signals)
+        dtype = signals.dtype if np.issubdtype(signals.dtype, np.floating) else np.float64
+        return signal.sosfilt(self.get_sos(degree, freq, btype, sampling_rate, dtype), signals, axis=-1)
+
+    def band_filter(self, signals, degree, band, sampling_rate):
+        # high-pass filter at the start of band followed by low-pass filter at it's stop
+        filtered_low = self.filter(signals, degree, band['start'], 'highpass', sampling_rate)
+        return self.filter(filtered_low, degree, band['stop'], 'lowpass', sampling_rate)
+
+
+# filters shared by all recordings processed in this process
+filter_bank = FilterBank()
+
+
+def butter_filter(signals_raw, filter_degree, filter_freq, sampling_rate):
+    filtered = filter_bank.filter(signals_raw, filter_degree, filter_freq, 'highpass', sampling_rate)
     # ax2.plot(t, filtered)
     # ax2.set_title('After 15 Hz high-pass filter')
     # ax2.axis([0, 1, -2, 2])
@@ -96,21 +210,16 @@ def butter_filter(signals_raw, filter_degree, filter_freq):
     return filtered
 
 
-def get_tag_frames(name, signals, sampling_rate, epoch_size, overlap, tag_time):
-
-    epochs = []
+def get_tag_samples(tag_time, sampling_rate):
+    # convert start and stop times of every tagged frame to sample numbers, counted from the begin of the recording
+    # returns list of (start_sample, stop_sample)
 
-    # windows settings
-    frame_numbers = len(tag_time['start'])
-    print(frame_numbers)
-
-    temp_results = []
+    tag_samples = []
+    if not tag_time['start']:
+        return tag_samples
     tag_begin = datetime.strptime(tag_time['begin'][0], '%H:%M:%S')
 
     for f_start, f_stop in zip(tag_time['start'], tag_time['stop']):
-
-        print(f_start, f_stop)
-
         # time to sample numbers conversion
         # start - begin > s * sampling rate
         tag_start = datetime.strptime(f_start, '%H:%M:%S')
@@ -120,89 +229,226 @@ def get_tag_frames(name, signals, sampling_rate, epoch_size, overlap, tag_time):
         tag_stop = datetime.strptime(f_stop, '%H:%M:%S')
         stop_sample = ((tag_stop.hour - tag_begin.hour) * 60 * 60 + (tag_stop.minute - tag_begin.minute) * 60 + (
                     tag_stop.second - tag_begin.second)) * sampling_rate
-        # select samples from start to stop
-        data_to_analyze = signals[:, start_sample:stop_sample]
+        tag_samples.append((start_sample, stop_sample))
+
+    return tag_samples
+
+
+def get_tag_epochs(name, signals, sampling_rate, epoch_size, overlap, tag_time):
+    # cut overlapping epochs out of every tagged frame of signals (channels x samples, or a Recording)
+    # returns (n_epochs, 2) array of start and stop samples of epochs in the recording and list of epochs,
+    # read-only (channels x samples) views of the frames, so no sample is copied
+
+    epochs = []
+    epoch_index = []
+
+    # windows settings
+    frame_numbers = len(tag_time['start'])
+    print(frame_numbers)
+
+    for f_start, f_stop, (start_sample, stop_sample) in zip(tag_time['start'], tag_time['stop'], get_tag_samples(tag_time, sampling_rate)):
+
+        print(f_start, f_stop)
+
+        # select samples from start to stop; a Recording reads only them
+        if isinstance(signals, dataExtraction.Recording):
+            data_to_analyze = signals.getSamples(start_sample, stop_sample).T
+        else:
+            data_to_analyze = signals[:, start_sample:stop_sample]
 
         # verify length
         if data_to_analyze.shape[1] > epoch_size * sampling_rate:
             print(data_to_analyze.shape[1])
 
-            # get window for analysis (time x channels)
-            n_channels = data_to_analyze.shape[0]
-            # create time stamps for epochs
-            t_stamp = np.arange(0, data_to_analyze.shape[1] + 1, round(overlap) * sampling_rate)
+            # create time stamps for epochs, each epoch spans two steps of overlap seconds
+            step = round(overlap) * sampling_rate
+            t_stamp = np.arange(0, data_to_analyze.shape[1] + 1, step)
             epoch_start = t_stamp[:-2]
             epoch_stop = t_stamp[2:]
 
-            # for each epoch
-            for e_start, e_stop in zip(epoch_start, epoch_stop):
-                print(e_start, e_stop)
-
-                eeg_raw = data_to_analyze[:, e_start:e_stop]
-
-                epochs.append(eeg_raw)
+            # epochs are strided views of the frame, (epochs x channels x samples)
+            if len(epoch_start) > 0:
+                frame_epochs = sliding_window_view(data_to_analyze, 2 * step, axis=1)[:, ::step][:, :len(epoch_start)]
+                epochs.extend(frame_epochs.transpose(1, 0, 2))
+                epoch_index.append(np.column_stack((epoch_start, epoch_stop)) + start_sample)
 
         # if not enough samples in frame, skip to next
         else:
             print('too short frame')
             continue
 
+    epoch_index = np.concatenate(epoch_index) if epoch_index else np.zeros((0, 2), dtype=int)
+    return epoch_index, epochs
+
+
+def get_tag_frames(name, signals, sampling_rate, epoch_size, overlap, tag_time):
+    # cut overlapping epochs out of every tagged frame of signals, as nested lists
+    # superseded by get_tag_epochs, which returns views instead of copying every sample into lists
+
+    epoch_index, epochs = get_tag_epochs(name, signals, sampling_rate, epoch_size, overlap, tag_time)
+
     #patients_data = dict()  # contain json with eeg frames
     patients_data = np.array(epochs).tolist()
 
     return patients_data
 
 
-def get_peak_results(name, data, epoch_size, sampling_rate, channelsNames, brain_waves, butter_degree):
+def get_frame_store_paths(framesPath, name):
+    # paths of the frame store of recording name: NPY file of epochs (epochs x channels x samples) and JSON index
+
+    return os.path.join(framesPath, name + '_frames.npy'), os.path.join(framesPath, name + '_frames.json')
+
+
+def save_frame_store(framesPath, name, epoch_index, epochs, tag_time, sampling_rate, epoch_shape=None, dtype=None):
+    # store epochs returned by get_tag_epochs as one contiguous NPY array, written epoch by epoch, and a JSON index
+    # with start and stop samples of every epoch, the tagged frame it was cut from and start and stop of tagged frames
+    # epoch_shape (channels, samples) and dtype of epochs are taken from the first epoch; without epochs they give
+    # the shape (0, channels, samples) and type of the stored array (by default (0, 0) and float64)
+
+    data_path, index_path = get_frame_store_paths(framesPath, name)
+    if len(epochs):
+        epoch_shape = np.shape(epochs[0])
+        dtype = epochs[0].dtype
+    shape = (len(epochs),) + tuple(epoch_shape if epoch_shape is not None else (0, 0))
+    dtype = dtype if dtype is not None else np.float64
+
+    # tagged frame of every epoch is the one containing it
+    tag_samples = np.array(get_tag_samples(tag_time, sampling_rate), dtype=int).reshape(-1, 2)
+    epoch_index = np.asarray(epoch_index, dtype=int).reshape(-1, 2)
+    if len(epoch_index):
+        is_inside = (tag_samples[:, 0] <= epoch_index[:, :1]) & (epoch_index[:, 1:] <= tag_samples[:, 1])
+        epoch_tags = is_inside.argmax(axis=1)
+    else:
+        epoch_tags = np.zeros(0, dtype=int)
+
+    index = {'name': name, 'sampling_rate': sampling_rate, 'shape': list(shape), 'dtype': np.dtype(dtype).str,
+             'epoch_index': epoch_index.tolist(), 'tag': epoch_tags.tolist(), 'tag_samples': tag_samples.tolist(),
+             'tag_start': list(tag_time['start']), 'tag_stop': list(tag_time['stop'])}
+
+    # index is removed first and written last, so a store interrupted while writing is never loaded
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    frames = np.lib.format.open_memmap(data_path + '.tmp', mode='w+', dtype=dtype, shape=shape)
+    for epoch_nb, epoch in enumerate(epochs):
+        frames[epoch_nb] = epoch
+    frames.flush()
+    del frames
+    os.replace(data_path + '.tmp', data_path)
+    with open(index_path + '.tmp', 'w') as json_file:
+        json.dump(index, json_file)
+    os.replace(index_path + '.tmp', index_path)
+
+
+def load_frame_store(framesPath, name, mmap_mode='r'):
+    # load frame store of recording name written by save_frame_store; epochs are memory mapped (mmap_mode=None
+    # reads them into memory), so only epochs which are used, e.g. frames[index['tag'] == 0], are read from disk
+    # returns (index, frames), 'epoch_index', 'tag' and 'tag_samples' of index are arrays
+
+    data_path, index_path = get_frame_store_paths(framesPath, name)
+    with open(index_path, 'r') as json_file:
+        index = json.load(json_file)
+    for key in ['epoch_index', 'tag_samples']:
+        index[key] = np.array(index[key], dtype=int).reshape(-1, 2)
+    index['tag'] = np.array(index['tag'], dtype=int)
+
+    frames = np.load(data_path, mmap_mode=mmap_mode)
+    if list(frames.shape) != index['shape']:
+        raise ValueError('Frame store of ' + name + ' is not complete: frames of shape ' + str(frames.shape) +
+                         ', expected ' + str(tuple(index['shape'])))
+    return index, frames
+
+
+def get_band_slices(sample_number, sampling_rate, brain_waves):
+    # find frequencies of every band in brain_waves in spectra of frames of sample_number samples
+    # returns frequency vector hz (until half the sampling rate) and, for every band, slice of indexes of hz
+    # and of spectrum elements between start and stop of the band
+
+    Nyquist = sampling_rate / 2
+    Nsamples = int(math.floor(sample_number / 2))
+    hz = np.linspace(0, Nyquist, num=Nsamples)
+
+    band_slices = []
+    for wave in brain_waves:
+        wave_indexes = np.flatnonzero((hz > brain_waves[wave]['start']) & (hz < brain_waves[wave]['stop']))
+        if len(wave_indexes) == 0:
+            raise ValueError('no frequencies of %s band in frames of %d samples' % (wave, sample_number))
+        band_slices.append(slice(wave_indexes[0], wave_indexes[-1] + 1))
+    return hz, band_slices
+
+
+def get_peak_tensor(frames, sampling_rate, brain_waves, butter_degree, chunk_frames=8, dtype=None):
+    # estimate peak frequency of every band in brain_waves in every channel of frames (frames, channels, samples)
+    # at once: each band is filtered and transformed with one real FFT per chunk of chunk_frames frames, small enough
+    # for filtered chunks to stay in cache
+    # frames can also be a list of equal (channels, samples) arrays, e.g. views returned by get_tag_epochs; they are
+    # stacked (and converted to dtype) one chunk at a time
+    # returns peak frequencies of shape (frames, channels, bands), bands in order of brain_waves
+
+    channel_number, sample_number = np.shape(frames[0])
+    hz, band_slices = get_band_slices(sample_number, sampling_rate, brain_waves)
+    peaks = np.empty((len(frames), channel_number, len(brain_waves)))
+
+    for start in range(0, len(frames), chunk_frames):
+        chunk = np.asarray(frames[start:start + chunk_frames], dtype=dtype)
+        for wave_nb, wave in enumerate(brain_waves):
+            # highpass and lowpass filters, designed once for the sampling rate of the recording
+            filtered = filter_bank.band_filter(chunk, butter_degree, brain_waves[wave], sampling_rate)
+
+            # amplitude spectrum of the band only; scaling of amplitudes does not move their maximum
+            wave_amp = np.abs(np.fft.rfft(filtered, axis=-1)[..., band_slices[wave_nb]])
+            peaks[start:start + chunk_frames, :, wave_nb] = hz[band_slices[wave_nb]][np.argmax(wave_amp, axis=-1)]
+
+    return peaks
+
+
+def get_peak_results(name, data, epoch_size, sampling_rate, channelsNames, brain_waves, butter_degree, dtype=np.float64):
+
+    # integer frames (scaled per channel) are computed in single precision; peaks do not depend on the scale
+    if np.issubdtype(dtype, np.integer):
+        dtype = np.float32
 
     result_col_names = ['frame_number', 'channel', "gamma", "beta", "alpha", "theta", "delta"]
-    peak_results = pd.DataFrame(columns=result_col_names, dtype=float)
+    # bands which are not in result_col_names get columns after them
+    wave_names = result_col_names[2:] + [wave for wave in brain_waves if wave not in result_col_names]
     #time = np.arange(epoch_size * sampling_rate) / sampling_rate
 
-    # for each frame in patients data
-    for frame, frame_nb in zip(data, np.arange(len(data))):
-
-        eeg_raw = {key: value for key, value in zip(channelsNames, frame)}
-
-        # for each channel in frame
-        for channel_eeg, channel_name in zip(eeg_raw, channelsNames):
-            # print(channel_name)
-
-            channel_data = np.array(eeg_raw[channel_eeg])
-
-            # compute frequencies vector until half the sampling rate
-            Nyquist = sampling_rate / 2
-            Nsamples = int(math.floor(channel_data.size / 2))
-            hz = np.linspace(0, Nyquist, num=Nsamples)
-
-            # df for all patients
-            # peak_results = peak_results.append({'patient_ID': name, 'frame_number': frame_nb, 'channel_name': channel_name}, ignore_index=True)
-            # df for one patient
-            peak_results = peak_results.append({'frame_number': frame_nb, 'channel': channel_name}, ignore_index=True)
-
-            # for each wave filters
-            for wave in brain_waves:
-                # print(wave)
-
-                # highpass filter
-                sos = signal.butter(butter_degree, brain_waves[wave]['start'], 'highpass', fs=1000, output='sos')
-                filtered_low = signal.sosfilt(sos, channel_data)
-
-                # lowpass filter
-                sos = signal.butter(butter_degree, brain_waves[wave]['stop'], 'lowpass', fs=1000, output='sos')
-                filtered = signal.sosfilt(sos, filtered_low)
-
-                # Fourier transform
-                FourierCoeff = np.fft.fft(filtered) / filtered.size
-                DC = [np.abs(FourierCoeff[0])]
-                amp = np.concatenate((DC, 2 * np.abs(FourierCoeff[1:])))
-                amp = amp[:len(hz)]
-
-                # find frequency peak
-                wave_hz = hz[(hz > brain_waves[wave]['start']) & (hz < brain_waves[wave]['stop'])]
-                wave_amp = amp[(hz > brain_waves[wave]['start']) & (hz < brain_waves[wave]['stop'])]
-                max_peak = wave_hz[np.argmax(wave_amp)]
-                # print(max_peak)
-                peak_results.at[peak_results.index[-1], wave] = max_peak
+    # consecutive frames of equal shape make one run, whose peaks are estimated at once; frames can be a
+    # (frames, channels, samples) array, nested lists or views returned by get_tag_epochs, which are not copied
+    # before get_peak_tensor stacks them chunk by chunk. Channels of a frame without a name are skipped
+    if len(data) == 0:
+        # no frames, e.g. an empty frame store, give a DataFrame without rows
+        frame_runs = []
+    elif isinstance(data, np.ndarray) and data.ndim == 3:
+        frame_runs = [data[:, :len(channelsNames)]]
+    else:
+        frame_runs = []
+        for frame in data:
+            frame = np.asarray(frame)[:len(channelsNames)] if len(frame) else np.zeros((0, 0))
+            if frame_runs and np.shape(frame_runs[-1][0]) == frame.shape:
+                frame_runs[-1].append(frame)
+            else:
+                frame_runs.append([frame])
+
+    # results are collected in columns, one row per channel of every frame, and turned into a DataFrame once
+    frame_numbers = [np.zeros(0)]
+    channel_codes = [np.zeros(0, dtype=int)]
+    peaks = [np.zeros((0, len(brain_waves)))]
+    first_frame = 0
+    for frame_run in frame_runs:
+        frame_number, channel_number = len(frame_run), np.shape(frame_run[0])[0]
+        if channel_number > 0:
+            frame_numbers.append(np.repeat(np.arange(first_frame, first_frame + frame_number, dtype=np.float64), channel_number))
+            channel_codes.append(np.tile(np.arange(channel_number), frame_number))
+            peaks.append(get_peak_tensor(frame_run, sampling_rate, brain_waves, butter_degree, dtype=dtype).reshape(-1, len(brain_waves)))
+        first_frame += frame_number
+    frame_numbers = np.concatenate(frame_numbers)
+    channel_codes = np.concatenate(channel_codes)
+    peaks = np.concatenate(peaks)
+
+    # df for one patient
+    peak_results = pd.DataFrame({'frame_number': frame_numbers,
+                                 'channel': np.array(channelsNames, dtype=object)[channel_codes]})
+    for wave in wave_names:
+        peak_results[wave] = peaks[:, list(brain_waves).index(wave)] if wave in brain_waves else np.nan
 
     return peak_results
\ No newline at end of file
@@ -0,0 +1,115 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import dataExtraction
+
+# name of the catalog file stored in the data directory by default
+catalogName = "catalog.json"
+
+
+"""
+Probes file, whose path is given by ``path``, reading it's header only (see ``dataExtraction/Recording``) and creates
+it's catalog entry.
+Parameters:
+    path : string
+        Path to the file which has to be probed.
+Returns:
+    entry : dict
+        Format and size of the file, modification time, boolean value informing if the file contains EEG examination
+        data and, for such files, sampling rate, duration and names of channels.
+"""
+
+
+def probeFile(path):
+    status = os.stat(path)
+    entry = {"format": None, "valid": False, "size": status.st_size, "mtime": status.st_mtime_ns,
+             "samplingRate": None, "examinationTime": None, "channelsNames": None}
+    try:
+        recording = dataExtraction.Recording(path)
+    except (ValueError, OSError, UnicodeError):
+        return entry
+    entry["format"] = recording.fileFormat
+    entry["valid"] = True
+    entry["samplingRate"] = recording.samplingRate
+    entry["examinationTime"] = recording.examinationTime
+    entry["channelsNames"] = recording.channelsNames
+    return entry
+
+
+"""
+Builds catalog of files in directory given by ``dataPath`` and stores it in JSON file given by ``catalogPath``. Entries
+of files which did not change since the previous build, according to their size and modification time, are taken from
+the stored catalog; only new and changed files are probed, in parallel.
+Parameters:
+    dataPath : string
+        Path to the directory containing EEG examination files.
+    catalogPath : string
+        Path to the JSON catalog file; by default it is stored in ``dataPath``.
+    workers : int
+        Number of processes probing files; 1 probes them one by one, None uses all processors.
+Returns:
+    catalog : dict
+        Catalog entries (see ``probeFile``) of all files in the directory, by file name.
+"""
+
+
+def buildCatalog(dataPath, catalogPath=None, workers=None):
+    if catalogPath is None:
+        catalogPath = os.path.join(dataPath, catalogName)
+
+    # reading previously stored catalog
+    try:
+        with open(catalogPath, "r") as file:
+            storedCatalog = json.load(file)
+    except (OSError, ValueError):
+        storedCatalog = {}
+
+    # cache files and sample indexes of ``dataExtraction`` and the catalog itself are not cataloged
+    fileNames = [fileName for fileName in sorted(os.listdir(dataPath))
+                 if os.path.isfile(os.path.join(dataPath, fileName))
+                 and not fileName.endswith((".npy", ".npz", ".json", ".tmp"))]
+
+    # finding files which are new or changed since the catalog was stored
+    catalog = {}
+    changedNames = []
+    for fileName in fileNames:
+        status = os.stat(os.path.join(dataPath, fileName))
+        entry = storedCatalog.get(fileName)
+        if entry is not None and entry["size"] == status.st_size and entry["mtime"] == status.st_mtime_ns:
+            catalog[fileName] = entry
+        else:
+            changedNames.append(fileName)
+
+    # probing new and changed files
+    paths = [os.path.join(dataPath, fileName) for fileName in changedNames]
+    if workers == 1 or len(paths) < 2:
+        entries = [probeFile(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            entries = list(executor.map(probeFile, paths))
+    catalog.update(zip(changedNames, entries))
+    catalog = dict(sorted(catalog.items()))
+
+    # storing the catalog when anything changed
+    if catalog != storedCatalog:
+        with open(catalogPath + ".tmp", "w") as file:
+            json.dump(catalog, file, indent=1)
+        os.replace(catalogPath + ".tmp", catalogPath)
+    return catalog
+
+
+"""
+Selects files containing EEG examination data from catalog given by ``catalog`` and orders them from the largest one,
+so that the longest jobs are started first when files are processed in parallel.
+Parameters:
+    catalog : dict
+        Catalog returned by ``buildCatalog``.
+Returns:
+    fileNames : list
+        Names of files containing EEG examination data.
+"""
+
+
+def planFiles(catalog):
+    validNames = [fileName for fileName, entry in catalog.items() if entry["valid"]]
+    return sorted(validNames, key=lambda fileName: catalog[fileName]["size"], reverse=True)
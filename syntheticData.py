@@ -0,0 +1,297 @@
+import io
+from datetime import datetime, timedelta
+import numpy as np
+import dataExtraction
+
+# names of EEG channels written into ASC files; the ECG channel is written before them and the marker channel after
+ascChannelsNames = ["Fp1", "Fp2", "F7", "F3", "Fz", "F4", "F8", "T3", "C3", "Cz", "C4", "T4", "T5", "P3", "Pz", "P4",
+                    "T6", "O1", "O2"]
+
+# amplitudes of injected EEP and LFP artifacts in microvolts and gain of ECG signal injected as an artifact, large enough
+# for detection functions to find them
+artifactAmplitudes = {"EEP": 5000, "LFP": 3000, "ECG": 3}
+
+
+"""
+Generates background EEG examination data: Gaussian noise with alpha rhythm of random phase in every EEG channel and,
+when ``ecgChannel`` is True, heartbeats in the ECG channel stored first, as in ASC files.
+Parameters:
+    examinationTime : int
+        Duration of the EEG examination in seconds.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    eegChannelNumber : int
+        Number of EEG channels.
+    ecgChannel : bool
+        Boolean value informing if the ECG channel is generated.
+    generator : numpy.random.Generator
+        Generator of random values.
+Returns:
+    inputData : ndarray
+        EEG examination data, one row per sample, with the ECG channel first.
+"""
+
+
+def generateSignals(examinationTime, samplingRate, eegChannelNumber, ecgChannel, generator):
+    sampleNumber = examinationTime * samplingRate
+    time = np.arange(sampleNumber) / samplingRate
+    phases = generator.uniform(0, 2 * np.pi, eegChannelNumber)
+    eeg = generator.normal(0, 20, (sampleNumber, eegChannelNumber)) + \
+        15 * np.sin(2 * np.pi * 10 * time[:, np.newaxis] + phases)
+    if not ecgChannel:
+        return eeg
+
+    # heartbeats about 72 times a minute, as narrow pulses on noise
+    heartbeat = np.exp(-np.square((time % (1 / 1.2)) - 0.4) / 0.0005)
+    ecg = 300 * heartbeat + generator.normal(0, 5, sampleNumber)
+    return np.column_stack((ecg, eeg))
+
+
+"""
+Chooses places of ``artifactNumber`` artifacts of types given by ``types`` in EEG examination data, in blocks of
+``blockDuration`` seconds which do not contain other artifacts, so that every artifact is in one block.
+Parameters:
+    examinationTime : int
+        Duration of the EEG examination in seconds.
+    eegChannelNumber : int
+        Number of EEG channels.
+    artifactNumber : int
+        Number of artifacts.
+    types : iterable
+        Types of artifacts, "EEP", "LFP" or "ECG", chosen in turn.
+    blockDuration : int
+        Duration of a block in seconds.
+    seed : int
+        Seed of the generator of random values.
+Returns:
+    artifacts : list
+        Artifacts described by dictionaries with "type", "start" (in seconds), "duration" (in seconds) and "channel"
+        (number of EEG channel) keys.
+"""
+
+
+def placeArtifacts(examinationTime, eegChannelNumber, artifactNumber, types=("EEP", "LFP", "ECG"), blockDuration=4, seed=0):
+    generator = np.random.default_rng(seed)
+    blockNumber = examinationTime // blockDuration
+    if artifactNumber > blockNumber:
+        raise ValueError("Examination of " + str(examinationTime) + " seconds has not enough blocks for " +
+                         str(artifactNumber) + " artifacts")
+    blocks = np.sort(generator.choice(blockNumber, artifactNumber, replace=False))
+    types = list(types)
+    return [{"type": types[i % len(types)], "start": int(block) * blockDuration, "duration": blockDuration,
+             "channel": int(generator.integers(eegChannelNumber))} for i, block in enumerate(blocks)]
+
+
+"""
+Adds artifacts given by ``artifacts`` to EEG examination data given by ``inputData``: a constant potential (EEP), a slow
+wave of 0.3 Hz (LFP) or the ECG signal, amplified (ECG), in one EEG channel.
+Parameters:
+    inputData : ndarray
+        EEG examination data, one row per sample; changed in place.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    artifacts : list
+        Artifacts described by dictionaries (see ``placeArtifacts``).
+    firstChannel : int
+        Number of column of the first EEG channel; 1 when the ECG channel is stored first.
+"""
+
+
+def injectArtifacts(inputData, samplingRate, artifacts, firstChannel):
+    for artifact in artifacts:
+        start = int(artifact["start"] * samplingRate)
+        stop = start + int(artifact["duration"] * samplingRate)
+        column = firstChannel + artifact["channel"]
+        if artifact["type"] == "EEP":
+            inputData[start:stop, column] += artifactAmplitudes["EEP"]
+        elif artifact["type"] == "LFP":
+            time = np.arange(stop - start) / samplingRate
+            inputData[start:stop, column] += artifactAmplitudes["LFP"] * np.sin(2 * np.pi * 0.3 * time)
+        elif artifact["type"] == "ECG":
+            if firstChannel == 0:
+                raise ValueError("ECG artifacts need the ECG channel, which is stored only in ASC files")
+            inputData[start:stop, column] += artifactAmplitudes["ECG"] * inputData[start:stop, 0]
+        else:
+            raise ValueError("Unknown artifact type: " + str(artifact["type"]))
+
+
+"""
+Writes EEG examination data given by ``inputData`` into ASC file, whose path is given by ``path``, in the layout of
+GALNT ASCII converted files: ``dataExtraction.ascInformLines`` information lines followed by one line of values per
+sample, the ECG channel first and the marker channel, filled with zeros, last.
+Parameters:
+    path : string
+        Path to the file.
+    inputData : ndarray
+        EEG examination data, one row per sample, with the ECG channel first.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    channelsNames : list
+        Names of EEG channels.
+Returns:
+    inputData : ndarray
+        Values of the file, as read by ``dataExtraction/extractData``.
+"""
+
+
+def writeAsc(path, inputData, samplingRate, channelsNames):
+    inputData = np.column_stack((inputData, np.zeros(len(inputData)))).round(3)
+    names = ["EKG-RF"] + [name + "-RF" for name in channelsNames] + ["MK-RF"]
+    header = ['"GALNT ASCII CONVERTED FILE"',
+              '"Patient: synthetic"',
+              '"Recording length: %d seconds"' % (len(inputData) // samplingRate),
+              '"Sampling rate: %d.000 Hz"' % samplingRate,
+              '"Montage: referential"',
+              '"Filters: none"',
+              '"Date: 01.01.2020"',
+              '"Time: 08:00:00"',
+              '"' + '", "'.join(names) + '"',
+              '"Units: uV"',
+              '"----------"']
+    with open(path, "w") as file:
+        file.write("\n".join(header[:dataExtraction.ascInformLines]) + "\n")
+        np.savetxt(file, inputData, fmt="%.3f")
+    return inputData
+
+
+"""
+Writes EEG examination data given by ``inputData`` into TXT file, whose path is given by ``path``, in the layout of
+UTF-16 files of new EEG devices: ``dataExtraction.txtInformLines`` information lines, the first of them made of "%"
+characters, followed by one line per sample with ``dataExtraction.txtLeadingColumns`` leading columns, values of EEG
+channels and ``dataExtraction.txtTrailingColumns`` trailing columns. Lines informing about breaks in data, "SHORT"
+tokens, which are skipped by the reader, and "AMPSAT" tokens, which replace saturated values and are read as zeros,
+are inserted as in files of the devices.
+Parameters:
+    path : string
+        Path to the file.
+    inputData : ndarray
+        Values of ``dataExtraction.txtChannelsNames`` EEG channels, one row per sample.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    breakSamples : iterable
+        Numbers of samples preceded by a line informing about a break in data.
+    shortRate : float
+        Fraction of lines containing a "SHORT" token.
+    ampsatRate : float
+        Fraction of lines containing an "AMPSAT" token.
+    generator : numpy.random.Generator
+        Generator of random values choosing lines with tokens.
+Returns:
+    inputData : ndarray
+        Values of the file, as read by ``dataExtraction/extractData``.
+"""
+
+
+def writeTxt(path, inputData, samplingRate, breakSamples=(), shortRate=0.0, ampsatRate=0.0, generator=None):
+    if generator is None:
+        generator = np.random.default_rng(0)
+    inputData = inputData.round(2)
+    sampleNumber, channelNumber = inputData.shape
+    if channelNumber != len(dataExtraction.txtChannelsNames):
+        raise ValueError("TXT files contain " + str(len(dataExtraction.txtChannelsNames)) + " EEG channels, not " +
+                         str(channelNumber))
+
+    # values of saturated samples are read as zeros
+    isShort = generator.random(sampleNumber) < shortRate
+    isAmpsat = generator.random(sampleNumber) < ampsatRate
+    ampsatChannels = generator.integers(channelNumber, size=sampleNumber)
+    inputData[isAmpsat, ampsatChannels[isAmpsat]] = 0
+
+    # formatting values of all samples at once
+    text = io.StringIO()
+    np.savetxt(text, inputData, fmt="%.2f", delimiter="\t")
+    valueLines = text.getvalue().splitlines()
+    trailing = "\t".join(["0"] * dataExtraction.txtTrailingColumns)
+    breakSamples = set(breakSamples)
+    begin = datetime(2020, 1, 1, 8)
+
+    with open(path, "w", encoding="utf-16") as file:
+        file.write("%" * 24 + "\n")
+        for i in range(1, dataExtraction.txtInformLines - 1):
+            if i == 5:
+                file.write("Sampling Rate:\t%d.000 Hz\n" % samplingRate)
+            else:
+                file.write("Information line %d\n" % i)
+        file.write("\t".join(["Number", "Time", "Event", "Marker"] + list(dataExtraction.txtChannelsNames)) + "\n")
+
+        for sample, valueLine in enumerate(valueLines):
+            if sample in breakSamples:
+                file.write(dataExtraction.breakLine + "\n")
+            if isShort[sample] or isAmpsat[sample]:
+                values = valueLine.split("\t")
+                if isAmpsat[sample]:
+                    values[ampsatChannels[sample]] = "AMPSAT"
+                if isShort[sample]:
+                    values.insert(int(generator.integers(channelNumber)), "SHORT")
+                valueLine = "\t".join(values)
+            time = (begin + timedelta(seconds=sample / samplingRate)).strftime("%H:%M:%S")
+            file.write("%d\t%s\t0\t0\t%s\t%s\n" % (sample, time, valueLine, trailing))
+    return inputData
+
+
+"""
+Writes description file, whose path is given by ``path``, in the layout of UTF-16 notes of EEG examinations: a few
+information lines followed by one line per event with it's number, time and text. The first event starts the recording.
+Parameters:
+    path : string
+        Path to the file.
+    events : list
+        Tuples containing times of events in seconds from the start of the recording and their texts.
+    begin : string
+        Time of the start of the recording, in "%H:%M:%S" format.
+"""
+
+
+def writeDescription(path, events, begin="08:00:00"):
+    beginTime = datetime.strptime(begin, "%H:%M:%S")
+    with open(path, "w", encoding="utf-16") as file:
+        file.write("Opis badania EEG\nPacjent: synthetic\n\n")
+        file.write("d1 %s Początek zapisu\n" % begin)
+        for number, (seconds, text) in enumerate(events, start=2):
+            file.write("d%d %s %s\n" % (number, (beginTime + timedelta(seconds=seconds)).strftime("%H:%M:%S"), text))
+
+
+"""
+Creates synthetic EEG examination file, whose path is given by ``path``, in ASC or TXT format chosen by the extension
+of the path, with artifacts given by ``artifacts`` injected into background data (see ``generateSignals``).
+Parameters:
+    path : string
+        Path to the file, ending with "asc" or "txt".
+    examinationTime : int
+        Duration of the EEG examination in seconds.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+    artifacts : list
+        Artifacts described by dictionaries (see ``placeArtifacts``); ECG artifacts need the ECG channel of ASC files.
+    channelsNames : list
+        Names of EEG channels of ASC file; TXT files contain ``dataExtraction.txtChannelsNames`` channels.
+    breakNumber : int
+        Number of lines informing about a break in data, spread evenly over TXT file.
+    shortRate : float
+        Fraction of lines of TXT file containing a "SHORT" token.
+    ampsatRate : float
+        Fraction of lines of TXT file containing an "AMPSAT" token.
+    seed : int
+        Seed of the generator of random values.
+Returns:
+    inputData : ndarray
+        Values of the file, as read by ``dataExtraction/extractData``.
+"""
+
+
+def createRecording(path, examinationTime=60, samplingRate=512, artifacts=(), channelsNames=None, breakNumber=0,
+                    shortRate=0.0, ampsatRate=0.0, seed=0):
+    generator = np.random.default_rng(seed)
+    if path.endswith("asc"):
+        if channelsNames is None:
+            channelsNames = ascChannelsNames
+        inputData = generateSignals(examinationTime, samplingRate, len(channelsNames), True, generator)
+        injectArtifacts(inputData, samplingRate, artifacts, 1)
+        return writeAsc(path, inputData, samplingRate, channelsNames)
+    elif path.endswith("txt"):
+        inputData = generateSignals(examinationTime, samplingRate, len(dataExtraction.txtChannelsNames), False, generator)
+        injectArtifacts(inputData, samplingRate, artifacts, 0)
+        sampleNumber = len(inputData)
+        breakSamples = [sampleNumber * (i + 1) // (breakNumber + 1) for i in range(breakNumber)]
+        return writeTxt(path, inputData, samplingRate, breakSamples, shortRate, ampsatRate, generator)
+    raise ValueError("Unknown file format: " + path)
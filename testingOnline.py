@@ -0,0 +1,96 @@
+import os
+import tempfile
+import numpy as np
+import auxiliaryFunctions as aF
+import artifactDetection
+import dataExtraction
+import syntheticData
+import thresholdCalculation as tC
+
+## PARAMETERS
+# synthetic recordings: format, duration in seconds and seed; artifacts are injected every minute
+recordings = [("asc", 600, 0), ("txt", 600, 1), ("asc", 900, 2)]
+samplingRate = 512
+# largest fraction of flags of single channels which may differ from offline ones
+channelTolerance = 0.01
+
+
+"""
+Checks that running statistics of values of detection functions on all blocks of EEG examination data given by
+``inputData`` give the exact mean and standard deviation and a median within ``thresholdCalculation.medianTolerance``.
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+"""
+
+
+def checkStatistics(inputData, eegChannelNumber, examinationTime, samplingRate):
+    features = artifactDetection.measureDetections(inputData, eegChannelNumber, examinationTime, samplingRate, ("EEP", "LFP"))
+    for name, values in [("EEP minima", aF.calculateLogModulus(features["EEP"][0])),
+                         ("EEP maxima", aF.calculateLogModulus(features["EEP"][1])), ("LFP", features["LFP"])]:
+        statistics = tC.RunningStatistics(values.shape[0])
+        for block in range(values.shape[1]):
+            statistics.update(values[:, block])
+
+        standardDeviation = np.std(values, axis=1, ddof=1)
+        np.testing.assert_allclose(statistics.mean, np.mean(values, axis=1), rtol=1e-9, atol=1e-12, err_msg=name)
+        np.testing.assert_allclose(statistics.standardDeviation, standardDeviation, rtol=1e-9, atol=1e-12, err_msg=name)
+        medianError = np.abs(statistics.median - np.median(values, axis=1)) / standardDeviation
+        assert np.all(medianError <= tC.medianTolerance), \
+            "%s: median differs by %.3f standard deviations" % (name, medianError.max())
+
+
+"""
+Checks that flags of ``artifactDetection.performOnlineDetections`` agree with flags of
+``artifactDetection.performDetections`` on EEG examination data given by ``inputData``: merged flags on every block,
+flags of single channels on all but ``channelTolerance`` of blocks.
+Parameters:
+    inputData : ndarray
+        Whole EEG examination data.
+    eegChannelNumber : int
+        Number of EEG channels in EEG examination data.
+    examinationTime : int
+        Duration of the EEG examination.
+    samplingRate : int
+        Sampling rate used in EEG examination.
+Returns:
+    artifactNumber : int
+        Number of blocks flagged offline.
+"""
+
+
+def checkFlags(inputData, eegChannelNumber, examinationTime, samplingRate):
+    results, isArtifactOutput = artifactDetection.performDetections(inputData, eegChannelNumber, examinationTime, samplingRate)
+    onlineOutput = list(artifactDetection.performOnlineDetections(inputData, eegChannelNumber, examinationTime, samplingRate))
+
+    assert [blockIndex for blockIndex, _, _ in onlineOutput] == list(range(len(isArtifactOutput)))
+    assert [isArtifact for _, _, isArtifact in onlineOutput] == isArtifactOutput, "merged flags differ"
+    for detectorName, isArtifactMatrix in results.items():
+        onlineMatrix = np.array([blockResults[detectorName] for _, blockResults, _ in onlineOutput]).T
+        assert onlineMatrix.shape == isArtifactMatrix.shape, detectorName
+        differences = int(np.sum(onlineMatrix != isArtifactMatrix))
+        assert differences <= channelTolerance * isArtifactMatrix.size, \
+            "%s flags of %d blocks of channels differ" % (detectorName, differences)
+    return sum(isArtifactOutput)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        for fileFormat, examinationTime, seed in recordings:
+            path = os.path.join(directory, "online%d.%s" % (seed, fileFormat))
+            eegChannelNumber = len(syntheticData.ascChannelsNames if fileFormat == "asc" else dataExtraction.txtChannelsNames)
+            types = ("EEP", "LFP", "ECG") if fileFormat == "asc" else ("EEP", "LFP")
+            artifacts = syntheticData.placeArtifacts(examinationTime, eegChannelNumber, examinationTime // 60, types, seed=seed)
+            syntheticData.createRecording(path, examinationTime, samplingRate, artifacts, seed=seed)
+
+            data = dataExtraction.extractData(path)
+            checkStatistics(data[0], data[4], data[1], data[2])
+            artifactNumber = checkFlags(data[0], data[4], data[1], data[2])
+            print("%s %d s: online flags agree with offline flags, %d blocks with artifacts"
+                  % (fileFormat, examinationTime, artifactNumber))
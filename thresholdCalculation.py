@@ -1,10 +1,12 @@
-import math
+import json
+import os
+import numpy as np
 import auxiliaryFunctions as aF
 
 
 """
 Calculates thresholds for External Electrostatic Potentials (EEP) detection function.
-Called inside the ``artifactDetection/detectEEP`` function. 
+Per-channel reference of ``calculateThresholdsEEPArray``, which is used by the detection functions.
 Parameters:
     minMaxList : list
         List of tuples containing minimum and maximum signal values from each time block of a channel.
@@ -15,36 +17,41 @@ Returns:
 
 
 def calculateThresholdsEEP(minMaxList):
-    # creating lists to contain normalised min and max values from all blocks
-    minList = []
-    maxList = []
-
-    # iterating through minMaxList and filling minList and maxList with normalised values
-    for (xmin, xmax) in minMaxList:
-        xMin = xmin.item()
-        xMax = xmax.item()
-        if xMin != 0:
-            xMinNorm = math.log(abs(xMin), 10)
-            minList.append(xMinNorm)
-        elif xMin == 0:
-            minList.append(xMin)
-        if xMax != 0:
-            xMaxNorm = math.log(abs(xMax), 10)
-            maxList.append(xMaxNorm)
-        elif xMax == 0:
-            maxList.append(xMax)
-
-    # calculating median values in minList and maxList
-    minMedian = aF.calculateMedian(minList)
-    maxMedian = aF.calculateMedian(maxList)
-
-    # calculating standard deviation values in minList and maxList
-    minStandardDeviation = aF.calculateStandardDeviation(minList)
-    maxStandardDeviation = aF.calculateStandardDeviation(maxList)
-
-    # calculating values of minThreshold and maxThreshold
-    minThreshold = minMedian + 6 * minStandardDeviation
-    maxThreshold = maxMedian + 6 * maxStandardDeviation
+    # splitting minMaxList into minimum and maximum values of one channel
+    minima, maxima = np.array(minMaxList, dtype=np.float64).reshape(-1, 2).T
+
+    # calculating thresholds the same way as for many channels at once
+    minThresholds, maxThresholds = calculateThresholdsEEPArray(minima[np.newaxis], maxima[np.newaxis])
+
+    # creating tuple containing threshold values
+    thresholds = (float(minThresholds[0]), float(maxThresholds[0]))
+
+    # returning thresholds
+    return thresholds
+
+
+"""
+Calculates thresholds for External Electrostatic Potentials (EEP) detection function for all channels at once.
+Called inside the ``artifactDetection/classifyBlocksEEPArray`` function.
+Parameters:
+    minima : ndarray
+        Minimum signal values of each time block, one row per channel.
+    maxima : ndarray
+        Maximum signal values of each time block, one row per channel.
+Returns:
+    thresholds : tuple
+        Tuple containing ndarrays of minimum and maximum thresholds values, one value per channel.
+"""
+
+
+def calculateThresholdsEEPArray(minima, maxima):
+    # normalising min and max values from all blocks, zero values are left as zeros
+    minList = aF.calculateLogModulus(minima)
+    maxList = aF.calculateLogModulus(maxima)
+
+    # calculating median and sample standard deviation values of every channel
+    minThreshold = np.median(minList, axis=-1) + 6 * np.std(minList, axis=-1, ddof=1)
+    maxThreshold = np.median(maxList, axis=-1) + 6 * np.std(maxList, axis=-1, ddof=1)
 
     # creating tuple containing threshold values
     thresholds = (minThreshold, maxThreshold)
@@ -71,7 +78,7 @@ def calculateThresholdECG():
 
 """
 Calculates threshold for low-frequency potentials (LFP) detection function.
-Called inside the ``artifactDetection/detectLFP`` function. 
+Per-channel reference of ``calculateThresholdLFPArray``, which is used by the detection functions.
 Parameters:
     fourierList : list
         List containing Fourier-based function values from each time block of a channel.
@@ -90,3 +97,313 @@ def calculateThresholdLFP(fourierList):
 
     # returning threshold
     return threshold
+
+
+"""
+Calculates thresholds for low-frequency potentials (LFP) detection function for all channels at once.
+Called inside the ``artifactDetection/classifyBlocksLFPArray`` function.
+Parameters:
+    fourierMatrix : ndarray
+        Fourier-based function values of each time block, one row per channel.
+Returns:
+    thresholds : ndarray
+        Floating point threshold values, one value per channel.
+"""
+
+
+def calculateThresholdLFPArray(fourierMatrix):
+    # calculating median value of every channel
+    median = np.median(fourierMatrix, axis=-1)
+
+    # calculating threshold values
+    thresholds = 0.75 + 0.25 * median
+
+    # returning thresholds
+    return thresholds
+
+
+# **********************************************************************************************************************
+
+
+"""
+Running statistics of values of many channels, updated with one value per channel at a time, so that thresholds can be
+calculated before all blocks of EEG examination data are known. Mean and sample standard deviation are updated with
+Welford's algorithm; median is estimated with the P-square algorithm (Jain and Chlamtac), which keeps five markers per
+channel instead of all values. Until five values are known the median is exact; after a few minutes of blocks the
+estimated median of EEP and LFP values differs from the exact one by less than ``medianTolerance`` standard deviations of
+the values, so thresholds of median + 6 standard deviations move by less than 3% of their margin.
+Parameters:
+    channelNumber : int
+        Number of channels.
+Attributes:
+    count : int
+        Number of values of every channel.
+    mean : ndarray
+        Mean value of every channel.
+    standardDeviation : ndarray
+        Sample standard deviation of every channel, NaN until two values are known.
+    median : ndarray
+        Estimated median of every channel, NaN until a value is known.
+"""
+
+
+# largest difference between the median estimated by ``RunningStatistics`` and the exact one, in standard deviations of
+# values, found on EEP and LFP values of synthetic examinations of 5 to 15 minutes (see ``testingOnline.py``)
+medianTolerance = 0.15
+
+
+class RunningStatistics:
+    __slots__ = ("count", "mean", "_squaredDeviations", "_heights", "_positions", "_desiredPositions")
+
+    # increments of desired marker positions of the median after every value
+    _positionIncrements = np.array([0, 0.25, 0.5, 0.75, 1])
+
+    def __init__(self, channelNumber):
+        self.count = 0
+        self.mean = np.zeros(channelNumber)
+        self._squaredDeviations = np.zeros(channelNumber)
+        self._heights = np.zeros((channelNumber, 5))
+        self._positions = np.tile(np.arange(5, dtype=np.float64), (channelNumber, 1))
+        self._desiredPositions = np.tile(np.array([0, 1, 2, 3, 4], dtype=np.float64), (channelNumber, 1))
+
+    @property
+    def standardDeviation(self):
+        if self.count < 2:
+            return np.full(self.mean.shape, np.nan)
+        return np.sqrt(self._squaredDeviations / (self.count - 1))
+
+    @property
+    def median(self):
+        if self.count == 0:
+            return np.full(self.mean.shape, np.nan)
+        if self.count < 5:
+            return np.median(self._heights[:, :self.count], axis=1)
+        return self._heights[:, 2].copy()
+
+    """
+    Updates statistics with one value of every channel, given by ``values``.
+    """
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += 1
+
+        # updating mean and sum of squared deviations
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._squaredDeviations += delta * (values - self.mean)
+
+        # the first five values are the initial markers
+        if self.count <= 5:
+            self._heights[:, self.count - 1] = values
+            if self.count == 5:
+                self._heights.sort(axis=1)
+            return
+        self._updateMarkers(values)
+
+    def _updateMarkers(self, values):
+        heights = self._heights
+        positions = self._positions
+        rows = np.arange(len(values))
+
+        # extending extreme markers and finding the cell of every value
+        heights[:, 0] = np.minimum(heights[:, 0], values)
+        heights[:, 4] = np.maximum(heights[:, 4], values)
+        cell = np.clip(np.sum(heights[:, 1:4] <= values[:, np.newaxis], axis=1), 0, 3)
+
+        # incrementing positions of markers above the value
+        positions += np.arange(5) > cell[:, np.newaxis]
+        self._desiredPositions += self._positionIncrements
+
+        # adjusting heights of middle markers which are off their desired positions
+        for marker in range(1, 4):
+            difference = self._desiredPositions[:, marker] - positions[:, marker]
+            isMoved = ((difference >= 1) & (positions[:, marker + 1] - positions[:, marker] > 1)) | \
+                      ((difference <= -1) & (positions[:, marker - 1] - positions[:, marker] < -1))
+            if not isMoved.any():
+                continue
+            step = np.where(isMoved, np.sign(difference), 0)
+
+            # piecewise-parabolic prediction of the height
+            parabolic = heights[:, marker] + step / (positions[:, marker + 1] - positions[:, marker - 1]) * (
+                (positions[:, marker] - positions[:, marker - 1] + step) * (heights[:, marker + 1] - heights[:, marker]) /
+                (positions[:, marker + 1] - positions[:, marker]) +
+                (positions[:, marker + 1] - positions[:, marker] - step) * (heights[:, marker] - heights[:, marker - 1]) /
+                (positions[:, marker] - positions[:, marker - 1]))
+
+            # linear prediction when the parabolic one is not between neighbouring markers
+            neighbour = marker + np.where(isMoved, step, 1).astype(int)
+            linear = heights[:, marker] + step * (heights[rows, neighbour] - heights[:, marker]) / \
+                (positions[rows, neighbour] - positions[:, marker])
+            isParabolic = (heights[:, marker - 1] < parabolic) & (parabolic < heights[:, marker + 1])
+
+            heights[:, marker] = np.where(isMoved, np.where(isParabolic, parabolic, linear), heights[:, marker])
+            positions[:, marker] += step
+
+
+"""
+Calculates thresholds for External Electrostatic Potentials (EEP) detection function from running statistics of
+normalised minimum and maximum values of blocks known so far.
+Called inside the ``artifactDetection/flagEEP`` function.
+Parameters:
+    minStatistics : RunningStatistics
+        Running statistics of normalised minimum values of every channel.
+    maxStatistics : RunningStatistics
+        Running statistics of normalised maximum values of every channel.
+Returns:
+    thresholds : tuple
+        Tuple containing ndarrays of minimum and maximum thresholds values, one value per channel.
+"""
+
+
+def calculateThresholdsEEPOnline(minStatistics, maxStatistics):
+    minThreshold = minStatistics.median + 6 * minStatistics.standardDeviation
+    maxThreshold = maxStatistics.median + 6 * maxStatistics.standardDeviation
+    return minThreshold, maxThreshold
+
+
+"""
+Calculates thresholds for low-frequency potentials (LFP) detection function from running statistics of Fourier-based
+function values of blocks known so far.
+Called inside the ``artifactDetection/flagLFP`` function.
+Parameters:
+    statistics : RunningStatistics
+        Running statistics of Fourier-based function values of every channel.
+Returns:
+    thresholds : ndarray
+        Floating point threshold values, one value per channel.
+"""
+
+
+def calculateThresholdLFPOnline(statistics):
+    return 0.75 + 0.25 * statistics.median
+
+
+# **********************************************************************************************************************
+
+
+"""
+Fits thresholds of EEP and LFP detection functions over a cohort of EEG examinations at once, instead of every
+examination separately. Values of detection functions on all blocks of all examinations with the same number of EEG
+channels are pooled and thresholds of every channel are calculated from them the same way as for one examination. EEP
+values of integer data have to be multiplied by their scale (see ``artifactDetection/measureDetections``), otherwise
+ValueError is raised.
+Parameters:
+    recordingFeatures : list
+        Tuples containing number of EEG channels of an examination and values of detection functions on it's blocks,
+        returned by ``artifactDetection/measureDetections``.
+    blockDuration : float
+        Duration of a block in seconds, used when values were calculated.
+    hopDuration : float
+        Time between starts of consecutive blocks in seconds, used when values were calculated; by default equal to
+        ``blockDuration``.
+    samplingRate : int
+        Sampling rate of the examinations.
+Returns:
+    thresholdModel : dict
+        Durations of a block and between starts of blocks, sampling rate and thresholds of detection functions of every
+        channel, by number of EEG channels.
+"""
+
+
+def fitThresholdModel(recordingFeatures, blockDuration=4, hopDuration=None, samplingRate=None):
+    # grouping examinations by number of EEG channels
+    featureGroups = {}
+    for eegChannelNumber, features in recordingFeatures:
+        featureGroups.setdefault(str(eegChannelNumber), []).append(features)
+
+    if hopDuration is None:
+        hopDuration = blockDuration
+    thresholdModel = {"blockDuration": blockDuration, "hopDuration": hopDuration, "samplingRate": samplingRate,
+                      "channels": {}}
+    for eegChannelNumber, featureList in sorted(featureGroups.items()):
+        entry = {"recordingNumber": len(featureList)}
+
+        # pooling minimum and maximum values of blocks of all examinations
+        featuresEEP = [features["EEP"] for features in featureList if features.get("EEP") is not None]
+        if featuresEEP:
+            # values of integer data have to be multiplied by their scale to be pooled with other examinations
+            if any(np.issubdtype(np.asarray(values).dtype, np.integer) for values in featuresEEP):
+                raise ValueError("EEP values of integer data can not be pooled without their scale, measure them with "
+                                 "scale of the data (see artifactDetection/measureDetections)")
+            featuresEEP = np.concatenate(featuresEEP, axis=-1)
+            minThresholds, maxThresholds = calculateThresholdsEEPArray(featuresEEP[0], featuresEEP[1])
+            entry["EEP"] = {"blockNumber": featuresEEP.shape[-1], "minThresholds": minThresholds.tolist(),
+                            "maxThresholds": maxThresholds.tolist()}
+
+        # pooling Fourier-based function values of blocks of all examinations
+        featuresLFP = [features["LFP"] for features in featureList if features.get("LFP") is not None]
+        if featuresLFP:
+            featuresLFP = np.concatenate(featuresLFP, axis=-1)
+            entry["LFP"] = {"blockNumber": featuresLFP.shape[-1],
+                            "thresholds": calculateThresholdLFPArray(featuresLFP).tolist()}
+
+        thresholdModel["channels"][eegChannelNumber] = entry
+
+    return thresholdModel
+
+
+"""
+Selects thresholds of detection function given by ``detectorName`` from threshold model given by ``thresholdModel``,
+for the examination described by ``parameters``. Thresholds apply only to blocks of the same durations and sampling rate
+as the model was fitted on, otherwise ValueError is raised.
+Called inside the ``artifactDetection/classifyEEP`` and ``artifactDetection/classifyLFP`` functions.
+Parameters:
+    thresholdModel : dict
+        Threshold model returned by ``fitThresholdModel`` or ``loadThresholdModel``.
+    detectorName : string
+        Name of the detection function, "EEP" or "LFP".
+    parameters : dict
+        Parameters of the EEG examination and detection functions (see ``artifactDetection/createParameters``).
+Returns:
+    thresholds : dict
+        Thresholds of the detection function, one value per channel.
+"""
+
+
+def getModelThresholds(thresholdModel, detectorName, parameters):
+    # models stored without a setting were fitted before it was stored and do not match any examination
+    for setting in ("blockDuration", "hopDuration", "samplingRate"):
+        if thresholdModel.get(setting) != parameters[setting]:
+            raise ValueError("Threshold model was fitted with %s %s, not %s, fit it again with these settings"
+                             % (setting, thresholdModel.get(setting), parameters[setting]))
+    entry = thresholdModel["channels"].get(str(parameters["eegChannelNumber"]), {})
+    if detectorName not in entry:
+        raise ValueError("Threshold model has no %s thresholds for %d EEG channels"
+                         % (detectorName, parameters["eegChannelNumber"]))
+    return entry[detectorName]
+
+
+"""
+Stores threshold model given by ``thresholdModel`` in JSON file given by ``path``.
+Parameters:
+    thresholdModel : dict
+        Threshold model returned by ``fitThresholdModel``.
+    path : string
+        Path to the JSON file.
+Returns:
+    None
+"""
+
+
+def saveThresholdModel(thresholdModel, path):
+    with open(path + ".tmp", "w") as file:
+        json.dump(thresholdModel, file, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+"""
+Reads threshold model stored by ``saveThresholdModel`` in JSON file given by ``path``.
+Parameters:
+    path : string
+        Path to the JSON file.
+Returns:
+    thresholdModel : dict
+        Durations of a block and between starts of blocks, sampling rate and thresholds of detection functions of every
+        channel, by number of EEG channels.
+"""
+
+
+def loadThresholdModel(path):
+    with open(path, "r") as file:
+        return json.load(file)